@@ -0,0 +1,67 @@
+import queue
+import threading
+
+
+class Incumbent:
+    # An improved solution reported while a solver is still running. solution[i] is
+    # the vehicle of order i or -1, objective is its served cost and bound is the
+    # best proven objective bound when the solver has one (CP-SAT).
+    def __init__(self, solution, objective, elapsed, bound=None):
+        self.solution = solution
+        self.objective = objective
+        self.elapsed = elapsed
+        self.bound = bound
+
+    def __repr__(self):
+        return f"Incumbent(objective={self.objective}, elapsed={self.elapsed:.3f}, bound={self.bound})"
+
+
+class CancelToken:
+    # Cooperative cancellation shared between a caller and a running solver. Any
+    # object with is_set(), such as multiprocessing.Event(), can back the token.
+    def __init__(self, event=None):
+        self.event = event if event is not None else threading.Event()
+
+    def cancel(self):
+        self.event.set()
+
+    @property
+    def cancelled(self):
+        return self.event.is_set()
+
+    def wait(self, timeout=None):
+        return self.event.wait(timeout)
+
+
+def iter_incumbents(solve, cancel=None):
+    # Runs solve(on_improvement, cancel) in a background thread and yields every
+    # Incumbent as it is found. Leaving the loop early cancels the solver, e.g.
+    #   for incumbent in iter_incumbents(sa.simulated_annealing):
+    #       if incumbent.objective >= target:
+    #           break
+    cancel = cancel or CancelToken()
+    incumbents = queue.Queue()
+    done = object()
+    errors = []
+
+    def target():
+        try:
+            solve(incumbents.put, cancel)
+        except BaseException as e:
+            errors.append(e)
+        finally:
+            incumbents.put(done)
+
+    thread = threading.Thread(target=target, daemon=True)
+    thread.start()
+    try:
+        while True:
+            incumbent = incumbents.get()
+            if incumbent is done:
+                break
+            yield incumbent
+    finally:
+        cancel.cancel()
+        thread.join()
+    if errors:
+        raise errors[0]
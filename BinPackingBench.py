@@ -0,0 +1,236 @@
+import argparse
+import csv
+import glob
+import json
+import multiprocessing
+import os
+import random
+import sys
+import time
+
+from BinPackingBounds import optimality_gap, upper_bound
+from BinPackingCore import Assignment, Instance
+from BinPackingCP import SolverConfig, VehicleRoutingCPSAT, solution_from_assignments
+from BinPackingDP import ExactDPSolver
+from BinPackingGA import GeneticAlgorithm
+from BinPackingHybrid import solve_hybrid
+from BinPackingIO import load_arrays
+from BinPackingPresolve import solve_presolved
+from BinPackingProfile import Profiler
+from BinPackingSA import SimulatedAnnealing
+
+SOLVERS = ["cp", "cp-compact", "hybrid", "dp", "ga", "sa"]
+# Solvers built on the compact CP model, whose solutions may leave vehicles empty
+OPTIONAL_VEHICLE_SOLVERS = ("cp-compact", "hybrid")
+FIELDS = [
+    "suite", "instance", "solver", "seed", "time_limit", "objective", "feasible", "bound", "gap",
+    "wall_time", "iterations", "iterations_per_second",
+]
+
+
+def discover_instances(root="."):
+    # Every TestFrom(...) suite, in a stable order
+    paths = glob.glob(os.path.join(glob.escape(root), "TestFrom(*)", "test_case_*.txt"))
+    return sorted(paths, key=lambda path: (os.path.dirname(path), _case_number(path)))
+
+
+def _case_number(path):
+    name = os.path.splitext(os.path.basename(path))[0]
+    return int(name.rsplit("_", 1)[1])
+
+
+def evaluate_solution(instance, solution, allow_unused=False):
+    # Served cost and feasibility of solution[i] (vehicle index or -1) under the
+    # rule that every vehicle load lies in [c1, c2]; with allow_unused an empty
+    # vehicle is accepted as well.
+    if solution is None:
+        return None, False
+    assignment = Assignment(instance, list(solution))
+    return assignment.cost, assignment.is_feasible(allow_unused)
+
+
+def run_solver(solver, instance, seed, time_limit, cp_workers, profiler=None, bound=None):
+    # Returns (solution, iterations); profiler instruments the sa, ga and cp solvers.
+    # With an upper bound, sa and ga stop early once they reach it.
+    random.seed(seed)
+    config = SolverConfig(num_workers=cp_workers, max_time_in_seconds=time_limit, random_seed=seed)
+    if solver == "sa":
+        sa = SimulatedAnnealing(instance, None, initial_temp=1000, cooling_rate=0.95, time_limit=time_limit,
+                                upper_bound=bound, target_gap=0.0, profiler=profiler)
+        solution, _ = sa.simulated_annealing()
+        return solution, sa.iterations
+    if solver == "ga":
+        ga = GeneticAlgorithm(instance, None, population_size=50, generations=100,
+                              mutation_rate=0.1, time_limit=time_limit, upper_bound=bound, target_gap=0.0,
+                              profiler=profiler)
+        solution, _ = ga.evolve()
+        return solution, ga.generations_run
+    if solver in ("cp", "cp-compact", "hybrid"):
+        # The CP solvers run on the presolved instance; presolve and the model build
+        # count against the time limit as well. The full model ("cp") has every vehicle
+        # loaded, so presolve only drops the orders that fit no vehicle for it.
+        start_time = time.time()
+        branches = []
+
+        def solve(reduction):
+            reduced = reduction.instance
+            if solver == "hybrid":
+                config.max_time_in_seconds = max(0.0, time_limit - (time.time() - start_time))
+                _, assignments, total_cost, _ = solve_hybrid(
+                    reduced, heuristic_time=min(1, time_limit / 10), config=config,
+                    dominance=reduction.dominance, vehicle_classes=reduction.vehicle_classes)
+            else:
+                vr_cp_sat = VehicleRoutingCPSAT(reduced, None, compact=solver == "cp-compact",
+                                                dominance=reduction.dominance, profiler=profiler,
+                                                vehicle_classes=reduction.vehicle_classes)
+                config.max_time_in_seconds = max(0.0, time_limit - (time.time() - start_time))
+                _, assignments, total_cost, _ = vr_cp_sat.run(config)
+                branches.append(vr_cp_sat.num_branches)
+            return solution_from_assignments(reduced.num_orders, assignments, total_cost)
+
+        solution, _ = solve_presolved(instance, solve, optional_vehicles=solver in OPTIONAL_VEHICLE_SOLVERS)
+        return solution, sum(branches)
+    if solver == "dp":
+        dp = ExactDPSolver(instance, time_limit=time_limit)
+        solution, _ = dp.solve(seed)
+        return solution, dp.candidates_tried
+    raise ValueError(f"Unknown solver: {solver}")
+
+
+def run_benchmark(task):
+    path, solver, seed, time_limit, cp_workers, profile_dir = task
+    instance = Instance.from_arrays(load_arrays([path])[0])
+    suite = os.path.basename(os.path.dirname(path))
+    profiler = Profiler(solver) if profile_dir else None
+
+    start_time = time.time()
+    try:
+        solution, iterations = run_solver(solver, instance, seed, time_limit, cp_workers, profiler)
+    except ValueError:
+        if solver != "dp":
+            raise
+        # The knapsack table of the exact DP is over max_cells: a run without a solution
+        solution, iterations = None, 0
+    wall_time = time.time() - start_time
+
+    if profiler is not None:
+        # <suite>_<case>_<solver>_<seed>.json and .trace.json (Chrome trace format)
+        name = f"{suite}_{os.path.splitext(os.path.basename(path))[0]}_{solver}_{seed}"
+        profiler.write_json(os.path.join(profile_dir, name + ".json"))
+        profiler.write_chrome_trace(os.path.join(profile_dir, name + ".trace.json"))
+
+    objective, feasible = evaluate_solution(instance, solution, allow_unused=solver in OPTIONAL_VEHICLE_SOLVERS)
+    bound = upper_bound(instance)
+    gap = optimality_gap(objective if feasible else None, bound)
+    return {
+        "suite": suite,
+        "instance": os.path.basename(path),
+        "solver": solver,
+        "seed": seed,
+        "time_limit": time_limit,
+        "objective": objective,
+        "feasible": feasible,
+        "bound": bound,
+        "gap": round(gap, 4) if gap is not None else None,
+        "wall_time": round(wall_time, 4),
+        "iterations": iterations,
+        "iterations_per_second": round(iterations / wall_time, 2) if wall_time > 0 else 0.0,
+    }
+
+
+def run_benchmarks(paths, solvers, seeds, time_limit, jobs=None, cp_workers=1, profile_dir=None):
+    tasks = [
+        (path, solver, seed, time_limit, cp_workers, profile_dir)
+        for path in paths
+        for solver in solvers
+        for seed in seeds
+    ]
+    with multiprocessing.Pool(jobs or os.cpu_count()) as pool:
+        results = pool.map(run_benchmark, tasks, chunksize=1)
+    return results
+
+
+def _row_key(row):
+    return row["suite"], row["instance"], row["solver"], row["seed"]
+
+
+def compare_to_baseline(results, baseline, tolerance=0.02, speed_tolerance=0.5):
+    # A run regresses when it loses feasibility, when its objective drops by more
+    # than tolerance (relative), or when its iteration rate falls below
+    # speed_tolerance times the baseline rate.
+    reference = {_row_key(row): row for row in baseline}
+    regressions = []
+    for row in results:
+        old = reference.get(_row_key(row))
+        if old is None:
+            continue
+        reasons = []
+        if old["feasible"] and not row["feasible"]:
+            reasons.append("lost feasibility")
+        if old["objective"] is not None and (row["objective"] or 0) < old["objective"] * (1 - tolerance):
+            reasons.append(f"objective {row['objective']} < baseline {old['objective']}")
+        if row["iterations_per_second"] < old["iterations_per_second"] * speed_tolerance:
+            reasons.append(
+                f"iterations/s {row['iterations_per_second']} < baseline {old['iterations_per_second']}"
+            )
+        if reasons:
+            regressions.append((row, reasons))
+    return regressions
+
+
+def write_csv(results, path):
+    with open(path, "w", newline="") as f:
+        writer = csv.DictWriter(f, fieldnames=FIELDS)
+        writer.writeheader()
+        writer.writerows(results)
+
+
+def write_json(results, path):
+    with open(path, "w") as f:
+        json.dump(results, f, indent=2)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the solvers over the TestFrom(...) suites.")
+    parser.add_argument("--root", default=os.path.dirname(os.path.abspath(__file__)))
+    parser.add_argument("--solvers", nargs="+", choices=SOLVERS, default=["sa", "ga"])
+    parser.add_argument("--seeds", nargs="+", type=int, default=[0])
+    parser.add_argument("--time-limit", type=float, default=5)
+    parser.add_argument("--jobs", type=int, default=None, help="Instances solved in parallel")
+    parser.add_argument("--cp-workers", type=int, default=1, help="CP-SAT workers per instance")
+    parser.add_argument("--csv", help="Write the report as CSV")
+    parser.add_argument("--json", help="Write the report as JSON")
+    parser.add_argument("--baseline", help="JSON report to compare against")
+    parser.add_argument("--tolerance", type=float, default=0.02)
+    parser.add_argument("--profile", metavar="DIR",
+                        help="Write a profile and a Chrome trace of every run to DIR")
+    args = parser.parse_args()
+
+    if args.profile:
+        os.makedirs(args.profile, exist_ok=True)
+    paths = discover_instances(args.root)
+    results = run_benchmarks(paths, args.solvers, args.seeds, args.time_limit, args.jobs, args.cp_workers,
+                             args.profile)
+
+    for row in results:
+        print(f"{row['suite']}/{row['instance']} {row['solver']} seed={row['seed']}: "
+              f"objective={row['objective']} feasible={row['feasible']} gap={row['gap']} "
+              f"time={row['wall_time']}s it/s={row['iterations_per_second']}", file=sys.stderr)
+    if args.csv:
+        write_csv(results, args.csv)
+    if args.json:
+        write_json(results, args.json)
+
+    if args.baseline:
+        with open(args.baseline, "r") as f:
+            baseline = json.load(f)
+        regressions = compare_to_baseline(results, baseline, args.tolerance)
+        for row, reasons in regressions:
+            print(f"REGRESSION {row['suite']}/{row['instance']} {row['solver']} seed={row['seed']}: "
+                  + "; ".join(reasons), file=sys.stderr)
+        if regressions:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,137 @@
+import math
+
+# Upper bounds on the served-cost objective. All of them relax the c1 lower
+# bounds, so they hold whether or not vehicles may stay unused.
+
+DEFAULT_MAX_DP_CELLS = 5_000_000
+# knapsack_table time per cell, measured up to 100k orders
+DP_SECONDS_PER_CELL = 80e-9
+
+
+def _servable(instance):
+    demands, costs, _, upper = instance.columns()
+    max_upper = max(upper, default=-1)
+    return [(d, c) for d, c in zip(demands, costs) if d <= max_upper]
+
+
+def fractional_knapsack_bound(instance):
+    # Dantzig bound: fill the total capacity by cost/demand ratio, splitting the last order
+    _, _, _, upper = instance.columns()
+    capacity = sum(upper)
+    items = sorted(_servable(instance), key=lambda item: item[1] / item[0] if item[0] else math.inf,
+                   reverse=True)
+    bound = 0
+    for d, c in items:
+        if d <= capacity:
+            bound += c
+            capacity -= d
+        else:
+            bound += c * capacity / d
+            break
+    return math.floor(bound)
+
+
+def knapsack_table(items, capacity):
+    # best[w] = highest cost of a subset of items with total demand at most w
+    best = [0] * (capacity + 1)
+    for d, c in items:
+        if d > capacity:
+            continue
+        if d == 0:
+            best = [value + c for value in best]
+            continue
+        shifted = [value + c for value in best[:capacity + 1 - d]]
+        best[d:] = list(map(max, best[d:], shifted))
+    return best
+
+
+def capacity_dp_bound(instance, max_cells=DEFAULT_MAX_DP_CELLS):
+    # 0/1 knapsack over the pooled capacity of all vehicles; None when the table is too large
+    _, _, _, upper = instance.columns()
+    items = _servable(instance)
+    capacity = sum(upper)
+    if len(items) * (capacity + 1) > max_cells:
+        return None
+    return knapsack_table(items, capacity)[capacity]
+
+
+def per_vehicle_dp_bound(instance, max_cells=None):
+    # Each vehicle packs its own best knapsack; one table up to max c2 serves every
+    # vehicle. None when the table has more than max_cells cells.
+    _, _, _, upper = instance.columns()
+    items = _servable(instance)
+    if not upper:
+        return 0
+    capacity = max(max(upper), 0)
+    if max_cells is not None and len(items) * (capacity + 1) > max_cells:
+        return None
+    best = knapsack_table(items, capacity)
+    return min(sum(best[c2] for c2 in upper if c2 >= 0), sum(c for _, c in items))
+
+
+def lp_bound(instance):
+    # LP relaxation of the assignment model (x[i][j] in [0, 1], each order at most
+    # once, loads <= c2) solved with GLOP
+    from ortools.linear_solver import pywraplp
+
+    demands, costs, _, upper = instance.columns()
+    solver = pywraplp.Solver.CreateSolver("GLOP")
+    x = {}
+    for i, d in enumerate(demands):
+        for j, c2 in enumerate(upper):
+            if d <= c2:
+                x[i, j] = solver.NumVar(0, 1, f"x_{i}_{j}")
+
+    rows = [[] for _ in demands]
+    columns = [[] for _ in upper]
+    for (i, j), var in x.items():
+        rows[i].append(var)
+        columns[j].append((var, demands[i]))
+    for row in rows:
+        if len(row) > 1:
+            solver.Add(solver.Sum(row) <= 1)
+    for j, column in enumerate(columns):
+        if column:
+            solver.Add(solver.Sum([var * d for var, d in column]) <= upper[j])
+
+    solver.Maximize(solver.Sum([var * costs[i] for (i, _), var in x.items()]))
+    if solver.Solve() != pywraplp.Solver.OPTIMAL:
+        return None
+    return math.floor(solver.Objective().Value() + 1e-6)
+
+
+def compute_bounds(instance, use_lp=False, max_dp_cells=DEFAULT_MAX_DP_CELLS, max_vehicle_dp_cells=None):
+    # Every available bound, plus the tightest one under "best". max_dp_cells and
+    # max_vehicle_dp_cells cap the tables of the capacity and per-vehicle DPs.
+    bounds = {
+        "total_cost": sum(c for _, c in _servable(instance)),
+        "fractional": fractional_knapsack_bound(instance),
+        "per_vehicle_dp": per_vehicle_dp_bound(instance, max_vehicle_dp_cells),
+        "capacity_dp": capacity_dp_bound(instance, max_dp_cells),
+    }
+    if use_lp:
+        bounds["lp"] = lp_bound(instance)
+    bounds["best"] = min(value for value in bounds.values() if value is not None)
+    return bounds
+
+
+def upper_bound(instance, use_lp=False, max_dp_cells=DEFAULT_MAX_DP_CELLS, max_vehicle_dp_cells=None):
+    return compute_bounds(instance, use_lp, max_dp_cells, max_vehicle_dp_cells)["best"]
+
+
+def optimality_gap(objective, bound):
+    # Relative gap between an objective and an upper bound; 0 means proven optimal
+    if objective is None or bound is None:
+        return None
+    if bound <= 0:
+        return 0.0
+    return max(0.0, (bound - objective) / bound)
+
+
+def reached_gap(objective, bound, target_gap):
+    return (
+        target_gap is not None
+        and bound is not None
+        and objective is not None
+        and objective >= bound * (1 - target_gap)
+    )
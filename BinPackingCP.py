@@ -1,28 +1,154 @@
+import argparse
+import multiprocessing
+import os
+import sys
+import threading
+import time
+
 from ortools.sat.python import cp_model
 
+from BinPackingAnytime import Incumbent
+from BinPackingBounds import optimality_gap
+from BinPackingCore import Assignment, Instance
+from BinPackingIO import read_instance
+from BinPackingPresolve import solve_presolved
+from BinPackingProfile import NULL_PROFILER
+
+
+class SolverConfig:
+    # CP-SAT parameters for one solve. Options left as None keep the solver defaults;
+    # search_branching takes a search strategy name such as "FIXED_SEARCH". An
+    # upper_bound (e.g. from BinPackingBounds) is added to the model as a cut and
+    # relative_gap_limit stops the search once the incumbent is that close to the bound.
+    def __init__(self, num_workers=None, max_time_in_seconds=60, max_deterministic_time=None,
+                 random_seed=None, search_branching=None, symmetry_level=None, hints=None,
+                 log_search_progress=False, relative_gap_limit=None, upper_bound=None):
+        self.num_workers = num_workers
+        self.max_time_in_seconds = max_time_in_seconds
+        self.max_deterministic_time = max_deterministic_time
+        self.random_seed = random_seed
+        self.search_branching = search_branching
+        self.symmetry_level = symmetry_level
+        self.hints = hints
+        self.log_search_progress = log_search_progress
+        self.relative_gap_limit = relative_gap_limit
+        self.upper_bound = upper_bound
+
+    def apply(self, parameters):
+        if self.num_workers is not None:
+            parameters.num_search_workers = self.num_workers
+        if self.max_time_in_seconds is not None:
+            parameters.max_time_in_seconds = self.max_time_in_seconds
+        if self.max_deterministic_time is not None:
+            parameters.max_deterministic_time = self.max_deterministic_time
+        if self.random_seed is not None:
+            parameters.random_seed = self.random_seed
+        if self.search_branching is not None:
+            parameters.search_branching = getattr(cp_model, self.search_branching)
+        if self.symmetry_level is not None:
+            parameters.symmetry_level = self.symmetry_level
+        if self.relative_gap_limit is not None:
+            parameters.relative_gap_limit = self.relative_gap_limit
+        parameters.log_search_progress = self.log_search_progress
+
+
+def default_portfolio(max_time_in_seconds=60, num_cores=None, hints=None):
+    # Differently parameterized and seeded solves that split the available cores
+    strategies = [
+        ("AUTOMATIC_SEARCH", 0),
+        ("PORTFOLIO_SEARCH", 1),
+        ("FIXED_SEARCH", 2),
+        ("LP_SEARCH", 3),
+        ("PSEUDO_COST_SEARCH", 4),
+        ("PORTFOLIO_WITH_QUICK_RESTART_SEARCH", 5),
+    ]
+    num_cores = num_cores or os.cpu_count() or 1
+    strategies = strategies[:max(1, min(len(strategies), num_cores))]
+    workers = max(1, num_cores // len(strategies))
+    return [
+        SolverConfig(
+            num_workers=workers,
+            max_time_in_seconds=max_time_in_seconds,
+            random_seed=seed,
+            search_branching=branching,
+            hints=hints,
+        )
+        for branching, seed in strategies
+    ]
+
+
+class IncumbentCallback(cp_model.CpSolverSolutionCallback):
+    # Reports every CP-SAT solution as an Incumbent together with the current best
+    # bound, records it in the profiler's convergence trace and stops the search once
+    # cancel is cancelled.
+    def __init__(self, vr_cp_sat, on_improvement=None, cancel=None, profiler=NULL_PROFILER):
+        cp_model.CpSolverSolutionCallback.__init__(self)
+        self.vr_cp_sat = vr_cp_sat
+        self.on_improvement = on_improvement
+        self.cancel = cancel
+        self.profiler = profiler
+
+    def on_solution_callback(self):
+        self.profiler.record(int(self.ObjectiveValue()), self.BestObjectiveBound())
+        if self.on_improvement is not None:
+            solution = [-1] * self.vr_cp_sat.num_orders
+            for i, j, var in self.vr_cp_sat.assignment_vars:
+                if self.Value(var):
+                    solution[i] = j
+            self.on_improvement(Incumbent(
+                solution, int(self.ObjectiveValue()), self.WallTime(), self.BestObjectiveBound()
+            ))
+        if self.cancel is not None and self.cancel.cancelled:
+            self.StopSearch()
+
 
 class VehicleRoutingCPSAT:
-    def __init__(self, orders, vehicles):
-        self.orders = orders
-        self.vehicles = vehicles
-        self.num_orders = len(orders)
-        self.num_vehicles = len(vehicles)
+    def __init__(self, orders, vehicles, compact=False, dominance=None, profiler=None,
+                 vehicle_classes=None):
+        # orders may also be an Instance, in which case vehicles is ignored. dominance
+        # holds (better, worse) order pairs and vehicle_classes the groups of vehicles
+        # with identical (c1, c2) from presolve; both are used by the compact model.
+        # profiler is an optional BinPackingProfile.Profiler; model building and the
+        # search are timed separately.
+        self.instance = Instance.coerce(orders, vehicles)
+        self.orders = self.instance.orders
+        self.vehicles = self.instance.vehicles
+        self.num_orders = self.instance.num_orders
+        self.num_vehicles = self.instance.num_vehicles
+        self.compact = compact
+        self.dominance = dominance or []
+        self.vehicle_classes = vehicle_classes
+        self.num_branches = 0
+        self.gap = None
+        self.profiler = profiler or NULL_PROFILER
         self.model = cp_model.CpModel()
 
+        with self.profiler.phase("build"):
+            if compact:
+                self.build_compact_model()
+            else:
+                self.build_model()
+
+    def build_model(self):
         # Decision variables
         self.x = [
             [self.model.NewBoolVar(f"x_{i}_{j}") for j in range(self.num_vehicles)]
             for i in range(self.num_orders)
         ]
+        self.assignment_vars = [
+            (i, j, self.x[i][j]) for i in range(self.num_orders) for j in range(self.num_vehicles)
+        ]
         self.vehicle_load = [
-            self.model.NewIntVar(0, sum(order[0] for order in orders), f"load_{j}")
+            self.model.NewIntVar(0, sum(self.instance.demands), f"load_{j}")
             for j in range(self.num_vehicles)
         ]
-        self.total_cost = self.model.NewIntVar(0, sum(order[1] for order in orders), "total_cost")
+        self.total_cost = self.model.NewIntVar(0, sum(self.instance.costs), "total_cost")
 
         self.add_constraints()
 
     def add_constraints(self):
+        demands, costs, lower, upper = self.instance.columns()
+
         # Constraint 1: Each order is assigned to exactly one vehicle
         for i in range(self.num_orders):
             self.model.Add(sum(self.x[i][j] for j in range(self.num_vehicles)) == 1)
@@ -31,52 +157,273 @@ class VehicleRoutingCPSAT:
         for j in range(self.num_vehicles):
             self.model.Add(
                 self.vehicle_load[j]
-                == sum(self.x[i][j] * self.orders[i][0] for i in range(self.num_orders))
+                == sum(self.x[i][j] * demands[i] for i in range(self.num_orders))
             )
-            self.model.Add(self.vehicle_load[j] >= self.vehicles[j][0])  # Min capacity
-            self.model.Add(self.vehicle_load[j] <= self.vehicles[j][1])  # Max capacity
+            self.model.Add(self.vehicle_load[j] >= lower[j])  # Min capacity
+            self.model.Add(self.vehicle_load[j] <= upper[j])  # Max capacity
 
         # Objective: Maximize the total cost of served orders
         self.model.Add(
             self.total_cost
             == sum(
-                self.x[i][j] * self.orders[i][1]
+                self.x[i][j] * costs[i]
                 for i in range(self.num_orders)
                 for j in range(self.num_vehicles)
             )
         )
         self.model.Maximize(self.total_cost)
 
-    def solve(self):
+    def build_compact_model(self):
+        # Orders may stay unserved and vehicles may stay unused. x[i] maps each vehicle
+        # that order i fits into to its literal; impossible pairs get no variable.
+        demands, costs, lower, upper = self.instance.columns()
+
+        # A vehicle is usable only if the orders that fit into it can reach its minimum load
+        usable = []
+        for j, (c1, c2) in enumerate(zip(lower, upper)):
+            if c1 <= c2 and sum(d for d in demands if d <= c2) >= c1:
+                usable.append(j)
+
+        self.x = [{} for _ in range(self.num_orders)]
+        self.assignment_vars = []
+        for i, d in enumerate(demands):
+            for j in usable:
+                if d <= upper[j]:
+                    var = self.model.NewBoolVar(f"x_{i}_{j}")
+                    self.x[i][j] = var
+                    self.assignment_vars.append((i, j, var))
+        self.pruned_orders = [i for i in range(self.num_orders) if not self.x[i]]
+
+        # Constraint 1: Each order is served by at most one vehicle
+        for i in range(self.num_orders):
+            if len(self.x[i]) > 1:
+                self.model.AddAtMostOne(self.x[i].values())
+
+        # Constraint 2: A used vehicle respects [c1, c2], an unused one carries nothing
+        self.vehicle_load = [None] * self.num_vehicles
+        self.vehicle_used = [None] * self.num_vehicles
+        for j in usable:
+            c1, c2 = lower[j], upper[j]
+            items = [(self.x[i][j], demands[i]) for i in range(self.num_orders) if j in self.x[i]]
+            load = self.model.NewIntVar(0, min(c2, sum(d for _, d in items)), f"load_{j}")
+            used = self.model.NewBoolVar(f"used_{j}")
+            self.model.Add(load == cp_model.LinearExpr.WeightedSum(
+                [var for var, _ in items], [d for _, d in items]
+            ))
+            self.model.Add(load >= c1).OnlyEnforceIf(used)
+            self.model.Add(load <= c2 * used)
+            self.vehicle_load[j] = load
+            self.vehicle_used[j] = used
+
+        # Symmetry breaking: vehicles with identical (c1, c2) are loaded in decreasing order
+        classes = self.vehicle_classes
+        if classes is None:
+            types = {}
+            for j in usable:
+                types.setdefault((lower[j], upper[j]), []).append(j)
+            classes = types.values()
+        usable = set(usable)
+        self.vehicle_types = [[j for j in group if j in usable] for group in classes]
+        for group in self.vehicle_types:
+            for a, b in zip(group, group[1:]):
+                self.model.Add(self.vehicle_load[a] >= self.vehicle_load[b])
+
+        # Dominance: an order is only served if its equal-demand, costlier twin is
+        for better, worse in self.dominance:
+            if self.x[worse]:
+                self.model.Add(sum(self.x[worse].values()) <= sum(self.x[better].values()))
+
+        # Objective: Maximize the total cost of served orders
+        self.total_cost = cp_model.LinearExpr.WeightedSum(
+            [var for _, _, var in self.assignment_vars],
+            [costs[i] for i, _, _ in self.assignment_vars],
+        )
+        self.model.Maximize(self.total_cost)
+
+    def canonical_solution(self, solution):
+        # An equivalent solution that also satisfies the compact model's dominance and
+        # symmetry breaking constraints: a costlier equal-demand twin takes over the
+        # vehicle of a cheaper served one (so the served cost can only go up), then the
+        # vehicles of each (c1, c2) type are relabelled so that their loads decrease in
+        # model order. Vehicle loads are unchanged up to the relabelling.
+        solution = list(solution)
+        if not self.compact:
+            return solution
+        changed = True
+        while changed:
+            changed = False
+            for better, worse in self.dominance:
+                if solution[worse] != -1 and solution[better] == -1:
+                    solution[better], solution[worse] = solution[worse], -1
+                    changed = True
+
+        loads = Assignment(self.instance, solution).loads
+        relabel = {}
+        for group in self.vehicle_types:
+            by_load = sorted(group, key=lambda j: -loads[j])
+            relabel.update(zip(by_load, group))
+        return [relabel.get(v, v) for v in solution]
+
+    def set_hints(self, solution):
+        # solution[i] is the vehicle of order i, or -1 when the order is not served. The
+        # compact model gets the canonical form, which its constraints accept.
+        # The loads (and used flags) are hinted as well, so the hint is complete.
+        solution = self.canonical_solution(solution)
+        self.model.ClearHints()
+        for i, j, var in self.assignment_vars:
+            self.model.AddHint(var, solution[i] == j)
+        loads = Assignment(self.instance, solution).loads
+        for j, load in enumerate(self.vehicle_load):
+            if load is not None:
+                self.model.AddHint(load, loads[j])
+        if self.compact:
+            for j, used in enumerate(self.vehicle_used):
+                if used is not None:
+                    self.model.AddHint(used, loads[j] > 0)
+
+    def is_model_feasible(self, solution):
+        # Whether solution satisfies every constraint of this model
+        if self.compact:
+            if any(v != -1 and v not in self.x[i] for i, v in enumerate(solution)):
+                return False
+            if any(solution[worse] != -1 and solution[better] == -1 for better, worse in self.dominance):
+                return False
+        elif any(v == -1 for v in solution):
+            return False
+        assignment = Assignment(self.instance, list(solution))
+        if self.compact:
+            loads = assignment.loads
+            for group in self.vehicle_types:
+                if any(loads[a] < loads[b] for a, b in zip(group, group[1:])):
+                    return False
+        return assignment.is_feasible(allow_unused=self.compact)
+
+    def add_objective_lower_bound(self, value):
+        self.model.Add(self.total_cost >= value)
+
+    def add_objective_upper_bound(self, value):
+        self.model.Add(self.total_cost <= value)
+
+    def run(self, config=None, on_improvement=None, cancel=None):
+        # max_time_in_seconds also covers setting the hints and bounds below
+        start_time = time.time()
+        config = config or SolverConfig()
+        if config.hints is not None:
+            self.set_hints(config.hints)
+        if config.upper_bound is not None:
+            self.add_objective_upper_bound(config.upper_bound)
+
         solver = cp_model.CpSolver()
-        solver.parameters.max_time_in_seconds = 60  # Limit runtime for larger inputs
+        config.apply(solver.parameters)
+        if config.max_time_in_seconds is not None:
+            solver.parameters.max_time_in_seconds = max(
+                0.0, config.max_time_in_seconds - (time.time() - start_time)
+            )
+        profiler = self.profiler
+        callback = None
+        if on_improvement is not None or cancel is not None or profiler.enabled:
+            callback = IncumbentCallback(self, on_improvement, cancel, profiler)
+
+        finished = threading.Event()
+        if cancel is not None:
+            # Cancellation also has to stop searches that are not producing solutions
+            def stop_on_cancel():
+                while not finished.is_set():
+                    if cancel.wait(0.05):
+                        solver.StopSearch()
+                        return
 
-        status = solver.Solve(self.model)
+            threading.Thread(target=stop_on_cancel, daemon=True).start()
+        try:
+            with profiler.phase("search"):
+                status = solver.Solve(self.model, callback)
+        finally:
+            finished.set()
+        self.num_branches = solver.NumBranches()
+        profiler.count("branches", self.num_branches)
+        profiler.count("conflicts", solver.NumConflicts())
 
+        # The bound is returned even without an incumbent, once the search has started:
+        # a time limit hit during presolve leaves CP-SAT reporting a bound of 0
+        bound = None
+        if status in (cp_model.OPTIMAL, cp_model.FEASIBLE) or (
+                status == cp_model.UNKNOWN and solver.NumBooleans() > 0):
+            bound = solver.BestObjectiveBound()
+            if config.upper_bound is not None:
+                bound = min(bound, config.upper_bound)
         if status == cp_model.OPTIMAL or status == cp_model.FEASIBLE:
-            print(f"Total cost of served orders: {solver.Value(self.total_cost)}")
             assignments = []
-            for i in range(self.num_orders):
-                for j in range(self.num_vehicles):
-                    if solver.Value(self.x[i][j]) == 1:
-                        assignments.append((i + 1, j + 1))  # Convert to 1-based index
+            for i, j, var in self.assignment_vars:
+                if solver.Value(var) == 1:
+                    assignments.append((i + 1, j + 1))  # Convert to 1-based index
+            total_cost = solver.Value(self.total_cost)
+            self.gap = optimality_gap(total_cost, bound)
+            return status, assignments, total_cost, bound
+        self.gap = None
+        return status, [], None, bound
+
+    def solve(self, config=None, on_improvement=None, cancel=None):
+        status, assignments, total_cost, _ = self.run(config, on_improvement, cancel)
+
+        if total_cost is not None:
+            print(f"Total cost of served orders: {total_cost}")
             for order, vehicle in assignments:
                 print(f"Order {order} is assigned to Vehicle {vehicle}")
-            return assignments, solver.Value(self.total_cost)
+            return assignments, total_cost
         else:
             print("No solution found.")
             return [], None
 
 
+def solution_from_assignments(num_orders, assignments, total_cost):
+    # The (order, vehicle) pairs of run, numbered from 1, as a vehicle index or -1 per order
+    if total_cost is None:
+        return None
+    solution = [-1] * num_orders
+    for order, vehicle in assignments:
+        solution[order - 1] = vehicle - 1
+    return solution
+
+
+def _run_portfolio_member(task):
+    orders, vehicles, config, compact, dominance = task
+    return VehicleRoutingCPSAT(orders, vehicles, compact=compact, dominance=dominance).run(config)
+
+
+def solve_portfolio(orders, vehicles=None, configs=None, processes=None, compact=False, dominance=None):
+    # Runs every config in its own process. The first proven optimum wins and the
+    # remaining solves are terminated; otherwise the best incumbent is returned
+    # together with the tightest objective bound seen. compact and dominance select
+    # the model as in VehicleRoutingCPSAT.
+    configs = configs or default_portfolio()
+    best_assignments, best_cost, best_bound = [], None, None
+
+    with multiprocessing.Pool(processes or len(configs)) as pool:
+        instance = Instance.coerce(orders, vehicles)
+        tasks = [(instance, None, config, compact, dominance) for config in configs]
+        for status, assignments, total_cost, bound in pool.imap_unordered(_run_portfolio_member, tasks):
+            if bound is not None and (best_bound is None or bound < best_bound):
+                best_bound = bound
+            if total_cost is not None and (best_cost is None or total_cost > best_cost):
+                best_assignments, best_cost = assignments, total_cost
+            if status == cp_model.OPTIMAL:
+                best_bound = total_cost
+                break
+
+    return best_assignments, best_cost, best_bound
+
+
 def read_input():
     # Read input from standard input
-    n, k = map(int, input().split())
-    orders = [tuple(map(int, input().split())) for _ in range(n)]
-    vehicles = [tuple(map(int, input().split())) for _ in range(k)]
-    return orders, vehicles
+    return read_instance(sys.stdin)
 
 
 def main():
+    parser = argparse.ArgumentParser(description="Solve stdin with CP-SAT.")
+    parser.add_argument("--full", action="store_true",
+                        help="Use the model that serves every order instead of the compact one")
+    args = parser.parse_args()
+
     # Read input
     orders, vehicles = read_input()
 
@@ -85,9 +432,27 @@ def main():
         print("No solution possible. Either no orders or no vehicles.")
         return
 
-    # Solve the problem
-    vr_cp_sat = VehicleRoutingCPSAT(orders, vehicles)
-    vr_cp_sat.solve()
+    if args.full:
+        VehicleRoutingCPSAT(orders, vehicles).solve()
+        return
+
+    # The compact model runs on the presolved instance, with its dominance pairs and
+    # vehicle classes
+    def solve(reduction):
+        vr_cp_sat = VehicleRoutingCPSAT(reduction.instance, None, compact=True, dominance=reduction.dominance,
+                                        vehicle_classes=reduction.vehicle_classes)
+        _, assignments, total_cost, _ = vr_cp_sat.run()
+        return solution_from_assignments(reduction.instance.num_orders, assignments, total_cost)
+
+    instance = Instance.from_tuples(orders, vehicles)
+    solution, _ = solve_presolved(instance, solve, optional_vehicles=True)
+    if solution is None:
+        print("No solution found.")
+        return
+    print(f"Total cost of served orders: {Assignment(instance, solution).cost}")
+    for i, v in enumerate(solution):
+        if v != -1:
+            print(f"Order {i + 1} is assigned to Vehicle {v + 1}")
 
 
 if __name__ == "__main__":
@@ -0,0 +1,200 @@
+import math
+import random
+from bisect import bisect_left, insort
+
+# Greedy constructors and repair. Solutions are lists with the vehicle of each order
+# or -1 when it is unserved. Every routine keeps per-vehicle loads up to date instead
+# of re-summing a vehicle over all orders, and runs in O(N log N + N * K).
+
+
+def vehicle_loads(instance, solution):
+    demands, _, _, _ = instance.columns()
+    loads = [0] * instance.num_vehicles
+    for v, d in zip(solution, demands):
+        if v != -1:
+            loads[v] += d
+    return loads
+
+
+def value_density(instance):
+    # Cost per unit of demand of every order; zero-demand orders come first
+    demands, costs, _, _ = instance.columns()
+    return [c / d if d else math.inf for d, c in zip(demands, costs)]
+
+
+def insert_orders(instance, solution, loads, sequence, best_fit=False, vehicles=None):
+    # Places each unserved order of sequence into a vehicle with room: the first one
+    # in vehicles order or, with best_fit, the one left with the least room. Orders
+    # larger than the most room left anywhere are skipped without a scan, and that
+    # maximum is only recomputed when the vehicle holding it takes an order.
+    demands, _, _, upper = instance.columns()
+    vehicles = list(range(len(loads))) if vehicles is None else list(vehicles)
+    room = max((upper[j] - loads[j] for j in vehicles), default=-1)
+    for i in sequence:
+        d = demands[i]
+        if solution[i] != -1 or d > room:
+            continue
+        target = -1
+        if best_fit:
+            least = room + 1
+            for j in vehicles:
+                left = upper[j] - loads[j] - d
+                if 0 <= left < least:
+                    target, least = j, left
+        else:
+            for j in vehicles:
+                if loads[j] + d <= upper[j]:
+                    target = j
+                    break
+        had_most_room = upper[target] - loads[target] == room
+        solution[i] = target
+        loads[target] += d
+        if had_most_room:
+            room = max((upper[j] - loads[j] for j in vehicles), default=-1)
+    return solution
+
+
+def first_fit(instance, sequence=None):
+    # Orders in index order (or sequence) to the first vehicle with room
+    solution = [-1] * instance.num_orders
+    loads = [0] * instance.num_vehicles
+    sequence = range(instance.num_orders) if sequence is None else sequence
+    return insert_orders(instance, solution, loads, sequence)
+
+
+def first_fit_decreasing(instance):
+    demands, _, _, _ = instance.columns()
+    return first_fit(instance, sorted(range(instance.num_orders), key=lambda i: -demands[i]))
+
+
+def best_fit_ratio(instance):
+    # Most valuable orders per unit of demand first, each to the tightest vehicle
+    density = value_density(instance)
+    sequence = sorted(range(instance.num_orders), key=lambda i: -density[i])
+    solution = [-1] * instance.num_orders
+    loads = [0] * instance.num_vehicles
+    return insert_orders(instance, solution, loads, sequence, best_fit=True)
+
+
+def regret_insertion(instance):
+    # Orders with the fewest good vehicles go first. The regret of an order is the
+    # extra room wasted by its second-best vehicle compared with its best one (infinite
+    # when a single vehicle can take it), measured against the empty vehicles so that
+    # it is computed once by bisection instead of after every insertion; ties are
+    # broken by value density.
+    demands, _, _, upper = instance.columns()
+    capacities = sorted(upper)
+    density = value_density(instance)
+    regret = []
+    for d in demands:
+        p = bisect_left(capacities, d)
+        fits = len(capacities) - p
+        if fits == 0:
+            regret.append(-math.inf)
+        elif fits == 1:
+            regret.append(math.inf)
+        else:
+            regret.append(capacities[p + 1] - capacities[p])
+    sequence = sorted(range(instance.num_orders), key=lambda i: (-regret[i], -density[i]))
+    solution = [-1] * instance.num_orders
+    loads = [0] * instance.num_vehicles
+    return insert_orders(instance, solution, loads, sequence, best_fit=True)
+
+
+def random_first_fit(instance, rng=random):
+    # First fit over shuffled orders and vehicles, for diverse starting points
+    sequence = list(range(instance.num_orders))
+    vehicles = list(range(instance.num_vehicles))
+    rng.shuffle(sequence)
+    rng.shuffle(vehicles)
+    solution = [-1] * instance.num_orders
+    loads = [0] * instance.num_vehicles
+    return insert_orders(instance, solution, loads, sequence, vehicles=vehicles)
+
+
+def fill_to_lower(instance, solution):
+    # Lower-bound-aware repair, in place:
+    #   1. overfull vehicles drop their least valuable orders per unit of demand;
+    #   2. vehicles below c1 take the most valuable unserved orders that fit, each
+    #      vehicle only until it reaches c1 so that one cannot starve the others;
+    #   3. vehicles still below c1 swap one of their orders for a larger unserved one
+    #      that lifts them into [c1, c2], found by bisection over the unserved demands;
+    #   4. vehicles still below c1 take orders from vehicles that stay at or above c1;
+    #   5. the remaining room is filled best-fit with the remaining unserved orders.
+    # The result can still violate c1 when no rearrangement of this kind exists.
+    demands, _, lower, upper = instance.columns()
+    loads = vehicle_loads(instance, solution)
+    density = value_density(instance)
+    ranked = sorted(range(instance.num_orders), key=density.__getitem__)
+
+    if any(load > c2 for load, c2 in zip(loads, upper)):
+        for i in ranked:
+            v = solution[i]
+            if v != -1 and loads[v] > upper[v]:
+                solution[i] = -1
+                loads[v] -= demands[i]
+
+    short = [j for j in range(instance.num_vehicles) if loads[j] < lower[j]]
+    if short:
+        for i in reversed(ranked):
+            if not short:
+                break
+            if solution[i] != -1:
+                continue
+            d = demands[i]
+            for j in short:
+                if loads[j] + d <= upper[j]:
+                    solution[i] = j
+                    loads[j] += d
+                    if loads[j] >= lower[j]:
+                        short.remove(j)
+                    break
+
+    if short:
+        members = [[] for _ in range(instance.num_vehicles)]
+        for i in ranked:
+            if solution[i] != -1:
+                members[solution[i]].append(i)
+        pool = sorted((demands[i], i) for i in range(instance.num_orders) if solution[i] == -1)
+        for j in short:
+            for a in members[j]:
+                deficit = lower[j] - loads[j]
+                if deficit <= 0:
+                    break
+                p = bisect_left(pool, (demands[a] + deficit, -1))
+                if p == len(pool) or pool[p][0] > demands[a] + upper[j] - loads[j]:
+                    continue
+                d, b = pool.pop(p)
+                solution[b] = j
+                solution[a] = -1
+                loads[j] += d - demands[a]
+                insort(pool, (demands[a], a))
+
+    for j in short:
+        for i in ranked:
+            if loads[j] >= lower[j]:
+                break
+            v = solution[i]
+            d = demands[i]
+            if v != -1 and v != j and loads[v] - d >= lower[v] and loads[j] + d <= upper[j]:
+                solution[i] = j
+                loads[v] -= d
+                loads[j] += d
+
+    return insert_orders(instance, solution, loads, reversed(ranked), best_fit=True)
+
+
+CONSTRUCTORS = {
+    "first_fit": first_fit,
+    "first_fit_decreasing": first_fit_decreasing,
+    "best_fit_ratio": best_fit_ratio,
+    "regret": regret_insertion,
+    "random": random_first_fit,
+}
+
+
+def construct(instance, name="best_fit_ratio", repair=True):
+    solution = CONSTRUCTORS[name](instance)
+    if repair:
+        fill_to_lower(instance, solution)
+    return solution
@@ -0,0 +1,115 @@
+from array import array
+
+
+class Instance:
+    # Orders and vehicles as typed int32 columns: demands/costs per order and
+    # lower (c1)/upper (c2) per vehicle. The arrays are the compact form that is
+    # stored, pickled to worker processes and written to the BPK1 format. Inner
+    # loops should index the list snapshots from columns() instead, since every
+    # array subscript allocates a fresh int object.
+    __slots__ = ("demands", "costs", "lower", "upper", "_columns")
+
+    def __init__(self, demands, costs, lower, upper):
+        self.demands = array("i", demands)
+        self.costs = array("i", costs)
+        self.lower = array("i", lower)
+        self.upper = array("i", upper)
+        self._columns = None
+
+    @classmethod
+    def from_tuples(cls, orders, vehicles):
+        return cls(
+            [order[0] for order in orders],
+            [order[1] for order in orders],
+            [vehicle[0] for vehicle in vehicles],
+            [vehicle[1] for vehicle in vehicles],
+        )
+
+    @classmethod
+    def from_arrays(cls, arrays):
+        return cls(*arrays)
+
+    @classmethod
+    def coerce(cls, orders, vehicles=None):
+        # Solvers accept either an Instance or the legacy lists of tuples
+        if isinstance(orders, cls):
+            return orders
+        return cls.from_tuples(orders, vehicles)
+
+    def __getstate__(self):
+        return self.demands, self.costs, self.lower, self.upper
+
+    def __setstate__(self, state):
+        self.demands, self.costs, self.lower, self.upper = state
+        self._columns = None
+
+    @property
+    def num_orders(self):
+        return len(self.demands)
+
+    @property
+    def num_vehicles(self):
+        return len(self.lower)
+
+    @property
+    def orders(self):
+        return list(zip(self.demands, self.costs))
+
+    @property
+    def vehicles(self):
+        return list(zip(self.lower, self.upper))
+
+    def arrays(self):
+        return self.demands, self.costs, self.lower, self.upper
+
+    def columns(self):
+        if self._columns is None:
+            self._columns = (
+                self.demands.tolist(),
+                self.costs.tolist(),
+                self.lower.tolist(),
+                self.upper.tolist(),
+            )
+        return self._columns
+
+
+class Assignment:
+    # solution[i] is the vehicle of order i or -1, with per-vehicle loads and the
+    # served cost kept up to date as orders are reassigned.
+    __slots__ = ("instance", "demands", "costs", "solution", "loads", "cost")
+
+    def __init__(self, instance, solution=None):
+        self.instance = instance
+        self.demands, self.costs, _, _ = instance.columns()
+        self.solution = solution if solution is not None else [-1] * instance.num_orders
+        self.loads = [0] * instance.num_vehicles
+        self.cost = 0
+        demands, costs, loads = self.demands, self.costs, self.loads
+        for i, v in enumerate(self.solution):
+            if v != -1:
+                loads[v] += demands[i]
+                self.cost += costs[i]
+
+    def assign(self, i, v):
+        # Moves order i to vehicle v; v == -1 leaves the order unserved
+        a = self.solution[i]
+        if a == v:
+            return
+        if a == -1:
+            self.cost += self.costs[i]
+        else:
+            self.loads[a] -= self.demands[i]
+        if v == -1:
+            self.cost -= self.costs[i]
+        else:
+            self.loads[v] += self.demands[i]
+        self.solution[i] = v
+
+    def is_feasible(self, allow_unused=False):
+        # Every vehicle load must lie in [c1, c2]; with allow_unused an empty vehicle
+        # is accepted as well
+        _, _, lower, upper = self.instance.columns()
+        return all(
+            c1 <= load <= c2 or (allow_unused and load == 0)
+            for load, c1, c2 in zip(self.loads, lower, upper)
+        )
@@ -0,0 +1,201 @@
+import random
+import sys
+import time
+from operator import gt
+
+from BinPackingBounds import optimality_gap
+from BinPackingCore import Instance
+from BinPackingIO import read_instance
+from BinPackingPresolve import solve_presolved
+
+NEG = -(1 << 62)
+
+
+class ExactDPSolver:
+    # Exact solver for small and medium instances built on two pseudo-polynomial DPs:
+    #   1. an exact-weight 0/1 knapsack over the pooled vehicle capacity gives, for every
+    #      total load w, the best served cost best[w] and one subset reaching it;
+    #   2. a bitset subset-sum per vehicle tries to split that subset over the vehicles
+    #      so that every load lands in [c1, c2].
+    # Totals are tried in decreasing best[w] order. The maximum of best[w] over the
+    # admissible totals is an upper bound, so a packing that reaches it is a proof of
+    # optimality (self.proven). With optional_vehicles an empty vehicle is allowed.
+    # time_limit bounds the whole solve: solve returns (None, None) when the knapsack
+    # table is not complete in time, and afterwards only the best total is tried
+    # past the limit.
+    def __init__(self, orders, vehicles=None, optional_vehicles=False, time_limit=5,
+                 max_candidates=200, packing_attempts=8, max_cells=50_000_000):
+        self.instance = Instance.coerce(orders, vehicles)
+        self.optional_vehicles = optional_vehicles
+        self.time_limit = time_limit
+        self.max_candidates = max_candidates
+        self.packing_attempts = packing_attempts
+        self.max_cells = max_cells
+        self.bound = None
+        self.proven = False
+        self.gap = None
+        self.candidates_tried = 0
+
+    def knapsack(self, items, capacity, deadline=None):
+        # best[w] for exact totals w, plus one bytes row per item marking the totals
+        # at which taking that item improved best[w] (used to rebuild the subset).
+        # Returns (None, None) once time.time() passes deadline.
+        demands, costs, _, _ = self.instance.columns()
+        best = [NEG] * (capacity + 1)
+        best[0] = 0
+        taken = []
+        for i in items:
+            if deadline is not None and time.time() > deadline:
+                return None, None
+            d, c = demands[i], costs[i]
+            if d > capacity:
+                taken.append(None)
+                continue
+            shifted = [value + c for value in best[:capacity + 1 - d]]
+            tail = best[d:]
+            taken.append(bytes(map(gt, shifted, tail)))
+            best[d:] = list(map(max, tail, shifted))
+        return best, taken
+
+    def rebuild(self, items, taken, w):
+        demands, _, _, _ = self.instance.columns()
+        subset = []
+        for index in range(len(items) - 1, -1, -1):
+            row = taken[index]
+            d = demands[items[index]]
+            if row is not None and w >= d and row[w - d]:
+                subset.append(items[index])
+                w -= d
+        return subset
+
+    def pack(self, subset, order):
+        # Splits subset over the vehicles in the given order; returns {order: vehicle} or None
+        demands, _, lower, upper = self.instance.columns()
+        remaining = [i for i in subset if demands[i] > 0]
+        total = sum(demands[i] for i in remaining)
+        rest_lower = 0 if self.optional_vehicles else sum(lower[j] for j in order)
+        rest_upper = sum(upper[j] for j in order)
+        packing = {}
+
+        for position, j in enumerate(order):
+            c1, c2 = lower[j], upper[j]
+            rest_lower -= 0 if self.optional_vehicles else c1
+            rest_upper -= c2
+            low = max(total - rest_upper, c1)
+            high = min(total - rest_lower, c2)
+            if position == len(order) - 1:
+                low = high = total
+
+            # Reachable loads: bit w of reach[k] is set when the first k items can sum to w
+            mask = (1 << (c2 + 1)) - 1
+            reach = [1]
+            for i in remaining:
+                reach.append((reach[-1] | (reach[-1] << demands[i])) & mask)
+            reachable = reach[-1]
+
+            load = None
+            for w in range(min(high, c2), max(low, c1) - 1, -1):
+                if reachable >> w & 1:
+                    load = w
+                    break
+            if load is None:
+                if self.optional_vehicles and total <= rest_upper:
+                    continue
+                return None
+
+            w = load
+            chosen = []
+            for index in range(len(remaining) - 1, -1, -1):
+                if not reach[index] >> w & 1:
+                    i = remaining[index]
+                    chosen.append(i)
+                    w -= demands[i]
+            chosen_set = set(chosen)
+            for i in chosen:
+                packing[i] = j
+            remaining = [i for i in remaining if i not in chosen_set]
+            total -= load
+
+        if remaining:
+            return None
+        # Zero-demand orders leave every load unchanged, so any vehicle can carry them
+        for i in subset:
+            if demands[i] == 0:
+                packing[i] = order[0]
+        return packing
+
+    def vehicle_orders(self, rng):
+        _, _, lower, upper = self.instance.columns()
+        vehicles = list(range(self.instance.num_vehicles))
+        yield sorted(vehicles, key=lambda j: (-upper[j], -lower[j]))
+        yield sorted(vehicles, key=lambda j: (-lower[j], -upper[j]))
+        yield sorted(vehicles, key=lambda j: (upper[j] - lower[j], -upper[j]))
+        for _ in range(max(0, self.packing_attempts - 3)):
+            rng.shuffle(vehicles)
+            yield list(vehicles)
+
+    def solve(self, seed=0):
+        start_time = time.time()
+        instance = self.instance
+        demands, _, lower, upper = instance.columns()
+        capacity = max(0, sum(upper))
+        items = [i for i in range(instance.num_orders) if demands[i] <= max(upper, default=-1)]
+        if len(items) * (capacity + 1) > self.max_cells:
+            raise ValueError("Instance is too large for the exact DP solver.")
+
+        self.bound = None
+        self.proven = False
+        self.gap = None
+        self.candidates_tried = 0
+        best, taken = self.knapsack(items, capacity, start_time + self.time_limit)
+        if best is None:
+            return None, None
+        min_total = 0 if self.optional_vehicles else sum(lower)
+        totals = [w for w in range(min_total, capacity + 1) if best[w] > NEG]
+        totals.sort(key=lambda w: -best[w])
+
+        self.bound = best[totals[0]] if totals else None
+        rng = random.Random(seed)
+        best_solution, best_cost = None, None
+
+        for w in totals[:self.max_candidates]:
+            if best_cost is not None and best[w] <= best_cost:
+                break
+            # Past the time limit the candidate search stops, but the best total is always tried
+            if self.candidates_tried and time.time() - start_time > self.time_limit:
+                break
+            self.candidates_tried += 1
+            subset = self.rebuild(items, taken, w)
+            for order in self.vehicle_orders(rng):
+                packing = self.pack(subset, order)
+                if packing is not None:
+                    best_solution = [-1] * instance.num_orders
+                    for i, j in packing.items():
+                        best_solution[i] = j
+                    best_cost = best[w]
+                    break
+
+        self.proven = best_cost is not None and best_cost == self.bound
+        self.gap = optimality_gap(best_cost, self.bound)
+        return best_solution, best_cost
+
+
+def main():
+    instance = Instance.from_tuples(*read_instance(sys.stdin))
+
+    def solve(reduction):
+        return ExactDPSolver(reduction.instance, time_limit=5).solve()[0]
+
+    solution, _ = solve_presolved(instance, solve)
+    if solution is None:
+        print("No solution found.")
+        return
+
+    served_orders = sum(1 for x in solution if x != -1)
+    print(served_orders)
+    for i, v in enumerate(solution):
+        print(i + 1, v + 1 if v != -1 else -1)
+
+
+if __name__ == "__main__":
+    main()
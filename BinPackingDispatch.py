@@ -0,0 +1,297 @@
+import argparse
+import csv
+import json
+import math
+import os
+import statistics
+import sys
+import time
+
+from BinPackingBench import OPTIONAL_VEHICLE_SOLVERS, run_solver
+from BinPackingBounds import upper_bound
+from BinPackingCore import Instance
+from BinPackingDP import ExactDPSolver
+from BinPackingGA import GeneticAlgorithm
+from BinPackingIO import load_arrays, read_instance
+from BinPackingPresolve import solve_presolved
+from BinPackingSA import SimulatedAnnealing
+
+# Solver dispatch. An instance is summarized by cheap features and mapped to a
+# bucket (N by powers of two, capacity slack by quarters). For every bucket the
+# policy keeps, per (solver, time_limit), how many past bench runs reached target
+# quality and their mean wall time, and picks the cheapest configuration whose
+# success rate is at least min_success. A run succeeds when its objective is within
+# target_gap of the best objective any run in the reports found for that instance
+# under the same feasibility rule: the OPTIONAL_VEHICLE_SOLVERS may leave vehicles
+# empty, so their runs are measured against every run, and the other solvers only
+# against the runs that load every vehicle. Those solvers are only chosen when the
+# caller accepts empty vehicles as well.
+# Buckets without enough runs fall back to rules: the exact DP when its estimated
+# runtime, with DP_SAFETY_FACTOR headroom, fits the budget, simulated annealing
+# otherwise. A learned DP choice is dropped the same way when the budget is capped
+# below its estimate. When the DP still finds nothing in time, run_plan hands what
+# is left of the budget to simulated annealing.
+
+# The parameters BinPackingBench runs the solvers with, so that learned results
+# carry over; GA populations shrink beyond the suite sizes to keep P * N constant.
+SOLVER_DEFAULTS = {
+    "sa": {"initial_temp": 1000, "cooling_rate": 0.95},
+    "ga": {"population_size": 50, "generations": 100, "mutation_rate": 0.1},
+    "cp": {"num_workers": 1},
+    "cp-compact": {"num_workers": 1},
+    "hybrid": {"num_workers": 1},
+    "dp": {},
+}
+DEFAULT_TIME_LIMIT = 5
+DP_MAX_CELLS = 50_000_000
+# Whole ExactDPSolver solve per knapsack cell, measured on the suites
+DP_SECONDS_PER_CELL = 90e-9
+# The estimate varies with the machine and the candidate search after the table
+DP_SAFETY_FACTOR = 2
+
+
+def instance_features(instance):
+    demands, _, lower, upper = instance.columns()
+    total_demand = sum(demands)
+    capacity = sum(upper)
+    mean_demand = total_demand / len(demands) if demands else 0.0
+    return {
+        "orders": instance.num_orders,
+        "vehicles": instance.num_vehicles,
+        # Total c2 over total demand: below 1 not every order can be served
+        "capacity_slack": capacity / total_demand if total_demand else math.inf,
+        # Total c1 over total demand: the share of the demand the vehicles must take
+        "lower_fill": sum(lower) / total_demand if total_demand else math.inf,
+        "mean_demand": mean_demand,
+        "demand_cv": statistics.pstdev(demands) / mean_demand if mean_demand else 0.0,
+        # Cells of the ExactDPSolver knapsack table
+        "dp_cells": instance.num_orders * (capacity + 1),
+    }
+
+
+def feature_bucket(features):
+    slack = features["capacity_slack"]
+    return features["orders"].bit_length(), min(8, int(slack * 4)) if slack != math.inf else 8
+
+
+class Plan:
+    def __init__(self, solver, time_limit, params=None, reason=""):
+        self.solver = solver
+        self.time_limit = time_limit
+        self.params = params or {}
+        self.reason = reason
+
+    def to_dict(self):
+        return {"solver": self.solver, "time_limit": self.time_limit, "params": self.params,
+                "reason": self.reason}
+
+
+class DispatchPolicy:
+    def __init__(self, target_gap=0.01, min_success=0.9, min_runs=3, cp_workers=1):
+        self.target_gap = target_gap
+        self.min_success = min_success
+        self.min_runs = min_runs
+        self.cp_workers = cp_workers
+        # bucket -> {(solver, time_limit): [runs, successes, total wall time]}
+        self.records = {}
+
+    def fit(self, rows, root="."):
+        # rows are BinPackingBench results (see read_report); the instances are read
+        # from root/<suite>/<instance> to compute their features
+        # (suite, instance, optional_vehicles) -> best objective under that rule
+        best = {}
+        for row in rows:
+            if row["feasible"] and row["objective"] is not None:
+                # A run that loads every vehicle is feasible under both rules
+                rules = (True,) if row["solver"] in OPTIONAL_VEHICLE_SOLVERS else (True, False)
+                for optional in rules:
+                    key = (row["suite"], row["instance"], optional)
+                    best[key] = max(best.get(key, 0), row["objective"])
+
+        buckets = {}
+        for row in rows:
+            key = (row["suite"], row["instance"])
+            if key not in buckets:
+                path = os.path.join(root, row["suite"], row["instance"])
+                instance = Instance.from_arrays(load_arrays([path])[0])
+                buckets[key] = feature_bucket(instance_features(instance))
+            rule = key + (row["solver"] in OPTIONAL_VEHICLE_SOLVERS,)
+            success = (row["feasible"] and row["objective"] is not None
+                       and row["objective"] >= best[rule] * (1 - self.target_gap))
+            stats = self.records.setdefault(buckets[key], {}).setdefault(
+                (row["solver"], row["time_limit"]), [0, 0, 0.0]
+            )
+            stats[0] += 1
+            stats[1] += success
+            stats[2] += row["wall_time"]
+        return self
+
+    def choose(self, features, optional_vehicles=False):
+        # Returns (solver, time_limit, reason), or None when the bucket has no
+        # configuration that is reliable enough. The OPTIONAL_VEHICLE_SOLVERS are
+        # candidates only with optional_vehicles.
+        candidates = []
+        for (solver, time_limit), (runs, successes, wall_time) in self.records.get(
+                feature_bucket(features), {}).items():
+            if solver in OPTIONAL_VEHICLE_SOLVERS and not optional_vehicles:
+                continue
+            if runs >= self.min_runs and successes >= self.min_success * runs:
+                candidates.append((wall_time / runs, time_limit, solver, successes / runs))
+        if not candidates:
+            return None
+        mean_time, time_limit, solver, rate = min(candidates)
+        return solver, time_limit, f"learned: {rate:.0%} of runs within target, {mean_time:.2f}s mean"
+
+    def plan(self, instance, time_limit=None, optional_vehicles=False):
+        # time_limit caps the budget, e.g. at the time left before a deadline;
+        # optional_vehicles accepts solutions that leave vehicles empty
+        features = instance_features(instance)
+        cap = DEFAULT_TIME_LIMIT if time_limit is None else time_limit
+        dp_seconds = features["dp_cells"] * DP_SECONDS_PER_CELL
+        dp_fits = features["dp_cells"] <= DP_MAX_CELLS and dp_seconds * DP_SAFETY_FACTOR <= cap
+        choice = self.choose(features, optional_vehicles)
+        if choice is not None and choice[0] == "dp" and dp_seconds * DP_SAFETY_FACTOR > min(choice[1], cap):
+            choice = None
+        if choice is None:
+            if dp_fits:
+                choice = "dp", DEFAULT_TIME_LIMIT, f"rule: DP estimated at {dp_seconds:.2f}s"
+            else:
+                choice = "sa", DEFAULT_TIME_LIMIT, f"rule: DP estimated at {dp_seconds:.2f}s, over budget"
+        solver, budget, reason = choice
+        if time_limit is not None:
+            budget = min(budget, time_limit)
+        return Plan(solver, budget, self.parameters(solver, features), reason)
+
+    def parameters(self, solver, features):
+        params = dict(SOLVER_DEFAULTS[solver])
+        if solver == "ga" and features["orders"] > 1000:
+            params["population_size"] = max(10, 50_000 // features["orders"])
+        if "num_workers" in params:
+            params["num_workers"] = self.cp_workers
+        return params
+
+    def to_dict(self):
+        return {
+            "target_gap": self.target_gap,
+            "min_success": self.min_success,
+            "min_runs": self.min_runs,
+            "records": [
+                {"orders_bucket": bucket[0], "slack_bucket": bucket[1], "solver": solver,
+                 "time_limit": time_limit, "runs": runs, "successes": successes, "wall_time": wall_time}
+                for bucket, configs in self.records.items()
+                for (solver, time_limit), (runs, successes, wall_time) in configs.items()
+            ],
+        }
+
+    def save(self, path):
+        with open(path, "w") as f:
+            json.dump(self.to_dict(), f, indent=2)
+
+    @classmethod
+    def load(cls, path, cp_workers=1):
+        with open(path, "r") as f:
+            data = json.load(f)
+        policy = cls(data["target_gap"], data["min_success"], data["min_runs"], cp_workers)
+        for record in data["records"]:
+            bucket = (record["orders_bucket"], record["slack_bucket"])
+            policy.records.setdefault(bucket, {})[(record["solver"], record["time_limit"])] = [
+                record["runs"], record["successes"], record["wall_time"]
+            ]
+        return policy
+
+
+def _parse_value(value):
+    if value in ("", "None"):
+        return None
+    if value in ("True", "False"):
+        return value == "True"
+    try:
+        return int(value)
+    except ValueError:
+        return float(value)
+
+
+def read_report(path):
+    # Rows of a BinPackingBench report written with --json or --csv
+    with open(path, "r", newline="") as f:
+        if path.endswith(".json"):
+            return json.load(f)
+        return [
+            {key: value if key in ("suite", "instance", "solver") else _parse_value(value)
+             for key, value in row.items()}
+            for row in csv.DictReader(f)
+        ]
+
+
+def run_plan(plan, instance, seed=0, bound=None):
+    # Returns the solution (vehicle index or -1 per order) or None. Heuristics stop
+    # early once they reach bound, computed with BinPackingBounds when not given.
+    params = plan.params
+    if plan.solver == "dp":
+        start_time = time.time()
+        solution = ExactDPSolver(instance, time_limit=plan.time_limit).solve(seed)[0]
+        if solution is not None:
+            return solution
+        # The DP ran out of time or found no packing: anneal for the rest of the budget
+        params = SOLVER_DEFAULTS["sa"]
+        plan = Plan("sa", max(0.0, plan.time_limit - (time.time() - start_time)), params,
+                    "fallback: DP found no solution in time")
+    if bound is None and plan.solver in ("sa", "ga"):
+        bound = upper_bound(instance)
+    if plan.solver == "sa":
+        sa = SimulatedAnnealing(instance, None, params["initial_temp"], params["cooling_rate"],
+                                plan.time_limit, upper_bound=bound, target_gap=0.0)
+        return sa.simulated_annealing()[0]
+    if plan.solver == "ga":
+        ga = GeneticAlgorithm(instance, None, params["population_size"], params["generations"],
+                              params["mutation_rate"], plan.time_limit,
+                              upper_bound=bound, target_gap=0.0)
+        return ga.evolve()[0]
+    # The CP solvers run as in BinPackingBench, presolve included
+    return run_solver(plan.solver, instance, seed, plan.time_limit, params["num_workers"])[0]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Solve stdin with the solver picked for the instance.")
+    parser.add_argument("--policy", help="Policy saved with --save-policy")
+    parser.add_argument("--reports", nargs="+", default=[], help="BinPackingBench JSON or CSV reports")
+    parser.add_argument("--root", default=os.path.dirname(os.path.abspath(__file__)),
+                        help="Directory holding the TestFrom(...) suites of the reports")
+    parser.add_argument("--target-gap", type=float, default=0.01)
+    parser.add_argument("--cp-workers", type=int, default=1)
+    parser.add_argument("--time-limit", type=float, default=None, help="Cap on the solver budget")
+    parser.add_argument("--save-policy", help="Learn from the reports, write the policy here and exit")
+    parser.add_argument("--optional-vehicles", action="store_true",
+                        help="Accept solutions that leave vehicles empty")
+    args = parser.parse_args()
+
+    if args.policy:
+        policy = DispatchPolicy.load(args.policy, args.cp_workers)
+    else:
+        policy = DispatchPolicy(args.target_gap, cp_workers=args.cp_workers)
+    for path in args.reports:
+        policy.fit(read_report(path), args.root)
+    if args.save_policy:
+        policy.save(args.save_policy)
+        return
+
+    instance = Instance.from_tuples(*read_instance(sys.stdin))
+
+    def solve(reduction):
+        plan = policy.plan(reduction.instance, args.time_limit, args.optional_vehicles)
+        print(f"Dispatch: {json.dumps(plan.to_dict())}", file=sys.stderr)
+        return run_plan(plan, reduction.instance)
+
+    solution, _ = solve_presolved(instance, solve, optional_vehicles=args.optional_vehicles)
+    if solution is None:
+        print("No solution found.")
+        return
+
+    served_orders = sum(1 for x in solution if x != -1)
+    print(served_orders)
+    for i, v in enumerate(solution):
+        print(i + 1, v + 1 if v != -1 else -1)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,145 +1,428 @@
+import multiprocessing
+import os
 import random
+import sys
 import time
+from collections import OrderedDict
+
+import numpy as np
+
+from BinPackingAnytime import Incumbent
+from BinPackingBounds import optimality_gap, reached_gap, upper_bound
+from BinPackingConstruct import CONSTRUCTORS, construct, fill_to_lower
+from BinPackingCore import Instance
+from BinPackingIO import read_instance
+from BinPackingOperators import CROSSOVERS, MUTATIONS, REPAIRS, SELECTIONS
+from BinPackingPresolve import solve_presolved
+from BinPackingProfile import NULL_PROFILER
+
+
+class PopulationEvaluator:
+    # Scores a whole generation at once: the population becomes a (P x N) int32 array
+    # and the loads and order counts of every vehicle of every individual come out of
+    # one np.bincount each, with individual p's vehicle v mapped to slot
+    # p * (K + 1) + v + 1 (slot 0 of each row collects the unserved orders).
+    # evaluate_one scores a single individual in pure Python, for the cache and for
+    # callers that only need one score.
+    def __init__(self, instance):
+        self.demands, self.costs, self.lower, self.upper = instance.columns()
+        self.num_vehicles = instance.num_vehicles
+        self.demand_array = np.asarray(self.demands, dtype=np.int64)
+        self.lower_array = np.asarray(self.lower, dtype=np.int64)
+        self.upper_array = np.asarray(self.upper, dtype=np.int64)
+
+    def evaluate_one(self, individual):
+        num_vehicles = self.num_vehicles
+        loads = [0] * num_vehicles
+        counts = [0] * num_vehicles
+        for v, d in zip(individual, self.demands):
+            if v != -1:
+                loads[v] += d
+                counts[v] += 1
+
+        total_cost = 0
+        penalty = 0
+        for load, count, c1, c2 in zip(loads, counts, self.lower, self.upper):
+            if c1 <= load <= c2:
+                total_cost += count
+            else:
+                penalty += 1000  # Penalty for invalid solutions
+        return total_cost - penalty, penalty == 0
+
+    def served_cost(self, individual):
+        return sum(c for v, c in zip(individual, self.costs) if v != -1)
+
+    def evaluate(self, population):
+        # Returns the fitness scores and the feasibility mask of the population
+        if not population:
+            return [], []
+        size = len(population)
+        slots = self.num_vehicles + 1
+        genes = np.array(population, dtype=np.int32).reshape(size, -1)
+        index = (genes + 1 + slots * np.arange(size, dtype=np.int32)[:, None]).ravel()
+        weights = np.broadcast_to(self.demand_array, genes.shape).ravel()
+        loads = np.bincount(index, weights, size * slots).reshape(size, slots)[:, 1:]
+        counts = np.bincount(index, None, size * slots).reshape(size, slots)[:, 1:]
+
+        valid = (loads >= self.lower_array) & (loads <= self.upper_array)
+        invalid = self.num_vehicles - valid.sum(axis=1)
+        fitness_scores = (counts * valid).sum(axis=1) - 1000 * invalid  # Penalty for invalid solutions
+        return fitness_scores.tolist(), (invalid == 0).tolist()
+
+
+class FitnessCache:
+    # Memoizes evaluate_one per distinct assignment, so elites and duplicated children
+    # are scored once. The key is the built-in hash of the individual as a tuple: it
+    # runs in C and costs about a tenth of an evaluation, where an incremental
+    # Zobrist-style hash updated in Python costs nearly as much as the evaluation it
+    # saves. Only the hash is stored, and a 64-bit collision is accepted as vanishingly
+    # unlikely. Entries are evicted least recently used once maxsize is exceeded.
+    def __init__(self, evaluator, maxsize=10000):
+        self.evaluator = evaluator
+        self.maxsize = maxsize
+        self.entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def hash(individual):
+        return hash(tuple(individual))
+
+    def evaluate(self, individual, hash_value=None):
+        # (fitness, feasible) of individual, computed only on a miss
+        if hash_value is None:
+            hash_value = hash(tuple(individual))
+        entries = self.entries
+        result = entries.get(hash_value)
+        if result is not None:
+            self.hits += 1
+            entries.move_to_end(hash_value)
+            return result
+        self.misses += 1
+        result = self.evaluator.evaluate_one(individual)
+        entries[hash_value] = result
+        if len(entries) > self.maxsize:
+            entries.popitem(last=False)
+        return result
+
+    def evaluate_population(self, population, hashes=None):
+        # Like PopulationEvaluator.evaluate: hits are served from the cache and all the
+        # misses are scored together in one batched call
+        if hashes is None:
+            hashes = [hash(tuple(individual)) for individual in population]
+        entries = self.entries
+        results = [None] * len(population)
+        pending = {}
+        for index, hash_value in enumerate(hashes):
+            result = entries.get(hash_value)
+            if result is not None:
+                self.hits += 1
+                entries.move_to_end(hash_value)
+                results[index] = result
+            elif hash_value in pending:
+                self.hits += 1
+                pending[hash_value].append(index)
+            else:
+                self.misses += 1
+                pending[hash_value] = [index]
+
+        if pending:
+            fitness_scores, feasible = self.evaluator.evaluate(
+                [population[indices[0]] for indices in pending.values()]
+            )
+            for (hash_value, indices), result in zip(pending.items(), zip(fitness_scores, feasible)):
+                entries[hash_value] = result
+                for index in indices:
+                    results[index] = result
+            while len(entries) > self.maxsize:
+                entries.popitem(last=False)
+        return [result[0] for result in results], [result[1] for result in results]
+
+    @property
+    def hit_rate(self):
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
 
 class GeneticAlgorithm:
-    def __init__(self, orders, vehicles, population_size, generations, mutation_rate, time_limit):
-        self.orders = orders
-        self.vehicles = vehicles
+    def __init__(self, orders, vehicles, population_size, generations, mutation_rate, time_limit,
+                 upper_bound=None, target_gap=None, cache_size=10000, selection="tournament",
+                 crossover="one_point", mutation="geometric", repair=None, profiler=None):
+        # orders may also be an Instance, in which case vehicles is ignored. Evolution
+        # stops early once the best served cost is within target_gap of upper_bound.
+        # cache_size bounds the fitness cache; 0 disables it. selection, crossover,
+        # mutation and repair name the operators from BinPackingOperators used by
+        # run_generations (repair=None leaves children unrepaired). profiler is an
+        # optional BinPackingProfile.Profiler.
+        self.instance = Instance.coerce(orders, vehicles)
+        self.orders = self.instance.orders
+        self.vehicles = self.instance.vehicles
         self.population_size = population_size
         self.generations = generations
         self.mutation_rate = mutation_rate
-        self.num_orders = len(orders)
-        self.num_vehicles = len(vehicles)
+        self.num_orders = self.instance.num_orders
+        self.num_vehicles = self.instance.num_vehicles
         self.time_limit = time_limit
+        self.evaluator = PopulationEvaluator(self.instance)
+        self.cache = FitnessCache(self.evaluator, cache_size) if cache_size else None
+        self.operators = (selection, crossover, mutation, repair)
+        self.selector = SELECTIONS[selection]
+        self.crossover_op = CROSSOVERS[crossover]
+        self.mutation_op = MUTATIONS[mutation]
+        self.repair_op = REPAIRS[repair](self.instance) if repair is not None else None
+        self.profiler = profiler or NULL_PROFILER
+        self.upper_bound = upper_bound
+        self.target_gap = target_gap
+        self.generations_run = 0
+        self.gap = None
 
     def initialize_population(self):
+        # One individual per deterministic constructor, the rest from shuffled first fit
+        names = [name for name in CONSTRUCTORS if name != "random"]
         population = []
-        for _ in range(self.population_size):
-            individual = [-1] * self.num_orders
-            vehicle_loads = [0] * self.num_vehicles
-
-            for order_index in range(self.num_orders):
-                for vehicle_index in range(self.num_vehicles):
-                    if vehicle_loads[vehicle_index] + self.orders[order_index][0] <= self.vehicles[vehicle_index][1]:
-                        individual[order_index] = vehicle_index
-                        vehicle_loads[vehicle_index] += self.orders[order_index][0]
-                        break
-
-            if not self.is_feasible(individual):
-                individual = self.repair_individual(individual)
-            population.append(individual)
+        for index in range(self.population_size):
+            name = names[index] if index < len(names) else "random"
+            population.append(construct(self.instance, name))
         return population
 
     def repair_individual(self, individual):
-        vehicle_loads = [0] * self.num_vehicles
-        for order_index in range(self.num_orders):
-            if individual[order_index] != -1:
-                vehicle_loads[individual[order_index]] += self.orders[order_index][0]
-
-        for i in range(self.num_orders):
-            if individual[i] == -1 or not self.is_feasible_for_order(i, individual[i], individual):
-                for vehicle_index in range(self.num_vehicles):
-                    if vehicle_loads[vehicle_index] + self.orders[i][0] <= self.vehicles[vehicle_index][1]:
-                        individual[i] = vehicle_index
-                        vehicle_loads[vehicle_index] += self.orders[i][0]
-                        break
-        return individual
-
-    def is_feasible_for_order(self, order_index, vehicle_index, individual):
-        vehicle_load = sum(self.orders[i][0] for i in range(self.num_orders) if individual[i] == vehicle_index)
-        new_load = vehicle_load + self.orders[order_index][0]
-        return self.vehicles[vehicle_index][0] <= new_load <= self.vehicles[vehicle_index][1]
+        return fill_to_lower(self.instance, individual)
 
-    def fitness(self, individual):
-        total_cost = 0
-        penalty = 0
-        for k in range(self.num_vehicles):
-            vehicle_orders = [i for i, v in enumerate(individual) if v == k]
-            load = sum(self.orders[i][0] for i in vehicle_orders)
+    def evaluate_one(self, individual, hash_value=None):
+        if self.cache is None:
+            return self.evaluator.evaluate_one(individual)
+        return self.cache.evaluate(individual, hash_value)
 
-            if self.vehicles[k][0] <= load <= self.vehicles[k][1]:
-                total_cost += len(vehicle_orders)
-            else:
-                penalty += 1000  # Penalty for invalid solutions
-        return total_cost - penalty
-
-    def select_parents(self, population, fitness_scores):
-        total_fitness = sum(fitness_scores)
-        probabilities = [f / total_fitness for f in fitness_scores]
-        parent1 = random.choices(population, probabilities)[0]
-        parent2 = random.choices(population, probabilities)[0]
-        return parent1, parent2
-
-    def crossover(self, parent1, parent2):
-        point = random.randint(1, self.num_orders - 1)
-        child1 = parent1[:point] + parent2[point:]
-        child2 = parent2[:point] + parent1[point:]
-        return child1, child2
-
-    def mutate(self, individual):
-        for i in range(self.num_orders):
-            if random.random() < self.mutation_rate:
-                individual[i] = random.choice(range(self.num_vehicles))
-        return individual
+    def evaluate_population(self, population, hashes=None):
+        # Like PopulationEvaluator.evaluate, but served from the cache when it is enabled
+        if self.cache is None:
+            return self.evaluator.evaluate(population)
+        return self.cache.evaluate_population(population, hashes)
+
+    def hash(self, individual):
+        return self.cache.hash(individual) if self.cache is not None else None
+
+    def fitness(self, individual):
+        return self.evaluate_one(individual)[0]
 
     def is_feasible(self, individual):
-        for k in range(self.num_vehicles):
-            vehicle_orders = [i for i, v in enumerate(individual) if v == k]
-            load = sum(self.orders[i][0] for i in vehicle_orders)
-            if not (self.vehicles[k][0] <= load <= self.vehicles[k][1]):
-                return False
-        return True
-
-    def evolve(self):
+        return self.evaluate_one(individual)[1]
+
+    def evolve(self, on_improvement=None, cancel=None):
+        # on_improvement receives an Incumbent (with the served cost as objective) each
+        # time the best feasible individual improves; cancel is a CancelToken.
         start_time = time.time()
-        population = self.initialize_population()
+        self.generations_run = 0
+        with self.profiler.phase("init"):
+            population = self.initialize_population()
+        _, current_solution, current_fitness, timed_out = self.run_generations(
+            population, self.generations, start_time + self.time_limit, on_improvement, cancel, start_time
+        )
+        if timed_out:
+            print("Time limit reached.")
+        self.gap = self.solution_gap(current_solution)
+        return current_solution, current_fitness
+
+    def solution_gap(self, solution):
+        if solution is None:
+            return None
+        return optimality_gap(self.evaluator.served_cost(solution), self.upper_bound)
+
+    def reached_target(self, solution):
+        return self.target_gap is not None and reached_gap(
+            self.evaluator.served_cost(solution), self.upper_bound, self.target_gap
+        )
+
+    def run_generations(self, population, generations, deadline, on_improvement=None, cancel=None,
+                        start_time=None):
+        start_time = start_time if start_time is not None else time.time()
         current_solution = None
         current_fitness = float('-inf')
         elitism_count = max(1, self.population_size // 10)
+        timed_out = False
+        hashes = [self.hash(individual) for individual in population]
+        num_vehicles, mutation_rate = self.num_vehicles, self.mutation_rate
+        mutate, repair = self.mutation_op, self.repair_op
+        profiler = self.profiler
+        clock = profiler.clock
+        cache = self.cache
+        hits, misses = (cache.hits, cache.misses) if cache is not None else (0, 0)
 
-        for generation in range(self.generations):
-            elapsed_time = time.time() - start_time
-            if elapsed_time > self.time_limit:
-                print("Time limit reached.")
+        for generation in range(generations):
+            if time.time() > deadline:
+                timed_out = True
+                break
+            if cancel is not None and cancel.cancelled:
                 break
+            self.generations_run += 1
 
-            fitness_scores = [self.fitness(ind) for ind in population]
+            with profiler.phase("evaluation"):
+                fitness_scores, feasible = self.evaluate_population(population, hashes)
+            profiler.count("evaluations", len(population))
 
+            improved = False
             for i, fitness in enumerate(fitness_scores):
-                if fitness > current_fitness and self.is_feasible(population[i]):
+                if fitness > current_fitness and feasible[i]:
                     current_solution = population[i]
                     current_fitness = fitness
+                    improved = True
+            if improved:
+                served_cost = self.evaluator.served_cost(current_solution)
+                profiler.record(served_cost, self.upper_bound)
+                if on_improvement is not None:
+                    on_improvement(Incumbent(current_solution[:], served_cost, time.time() - start_time))
+            if improved and self.reached_target(current_solution):
+                break
 
-            sorted_population = [ind for _, ind in sorted(zip(fitness_scores, population), reverse=True)]
-            elites = sorted_population[:elitism_count]
+            # Selection, variation (crossover and mutation) and repair (which includes
+            # hashing the children for the cache) are timed per pair of children and
+            # reported once per generation
+            selection_time = variation_time = repair_time = 0.0
+            t0 = clock()
+            ranked = sorted(range(len(population)), key=fitness_scores.__getitem__, reverse=True)
+            elites = ranked[:elitism_count]
 
-            new_population = elites[:]
+            new_population = [population[i] for i in elites]
+            new_hashes = [hashes[i] for i in elites]
+            pick = self.selector(fitness_scores)
             while len(new_population) < self.population_size:
-                parent1, parent2 = self.select_parents(population, fitness_scores)
-                child1, child2 = self.crossover(parent1, parent2)
-                child1 = self.mutate(child1)
-                child2 = self.mutate(child2)
-                if len(new_population) < self.population_size:
-                    new_population.append(child1)
+                parent1, parent2 = population[pick()], population[pick()]
+                t1 = clock()
+                child1, child2 = self.crossover_op(parent1, parent2, num_vehicles)
+                child1 = mutate(child1, mutation_rate, num_vehicles)
+                child2 = mutate(child2, mutation_rate, num_vehicles)
+                t2 = clock()
+                if repair is not None:
+                    repair(child1)
+                    repair(child2)
+                new_population.append(child1)
+                new_hashes.append(self.hash(child1))
                 if len(new_population) < self.population_size:
                     new_population.append(child2)
+                    new_hashes.append(self.hash(child2))
+                t3 = clock()
+                selection_time += t1 - t0
+                variation_time += t2 - t1
+                repair_time += t3 - t2
+                t0 = t3
+            profiler.add_time("selection", selection_time)
+            profiler.add_time("variation", variation_time)
+            profiler.add_time("repair", repair_time)
 
             population = new_population[:self.population_size]
+            hashes = new_hashes[:self.population_size]
+
+        if cache is not None:
+            profiler.count("cache_hits", cache.hits - hits)
+            profiler.count("cache_misses", cache.misses - misses)
+        return population, current_solution, current_fitness, timed_out
+
+    def evolve_islands(self, num_islands=None, migration_interval=10, migration_size=None,
+                       processes=None, seed=None, on_improvement=None, cancel=None):
+        # Island model: independent populations evolve in a process pool and exchange
+        # their elites along a ring every migration_interval generations. Improvements
+        # are reported and cancellation is checked between migrations.
+        start_time = time.time()
+        deadline = start_time + self.time_limit
+        num_islands = num_islands or os.cpu_count() or 1
+        migration_size = migration_size or max(1, self.population_size // 10)
+        rng = random.Random(seed)
+        params = (self.instance, None, self.population_size, self.generations,
+                  self.mutation_rate, self.time_limit, self.upper_bound, self.target_gap,
+                  self.cache.maxsize if self.cache is not None else 0, *self.operators)
+
+        populations = [None] * num_islands
+        current_solution = None
+        current_fitness = float('-inf')
+        generations_left = self.generations
+
+        with multiprocessing.Pool(processes or num_islands, initializer=_init_island,
+                                  initargs=(params,)) as pool:
+            while generations_left > 0 and time.time() < deadline:
+                if cancel is not None and cancel.cancelled:
+                    break
+                step = min(migration_interval, generations_left)
+                tasks = [(population, step, deadline, rng.getrandbits(32)) for population in populations]
+                with self.profiler.phase("island_epoch"):
+                    results = pool.map(_run_island_epoch, tasks)
+
+                timed_out = False
+                improved = False
+                for population, solution, fitness, island_timed_out in results:
+                    timed_out = timed_out or island_timed_out
+                    if solution is not None and fitness > current_fitness:
+                        current_solution = solution
+                        current_fitness = fitness
+                        improved = True
+                if improved:
+                    served_cost = self.evaluator.served_cost(current_solution)
+                    self.profiler.record(served_cost, self.upper_bound)
+                    if on_improvement is not None:
+                        on_improvement(Incumbent(current_solution[:], served_cost, time.time() - start_time))
+                populations = self.migrate([result[0] for result in results], migration_size)
+
+                generations_left -= step
+                if timed_out or (current_solution is not None and self.reached_target(current_solution)):
+                    break
 
+        self.gap = self.solution_gap(current_solution)
         return current_solution, current_fitness
 
+    def migrate(self, populations, migration_size):
+        # Populations arrive sorted best-first; each island's worst individuals are
+        # replaced by copies of the previous island's elites.
+        if len(populations) < 2:
+            return populations
+        migrated = []
+        for index, population in enumerate(populations):
+            elites = populations[index - 1][:migration_size]
+            keep = max(0, len(population) - len(elites))
+            migrated.append(population[:keep] + [elite[:] for elite in elites])
+        return migrated
+
+
+_island_ga = None
+
+
+def _init_island(params):
+    global _island_ga
+    _island_ga = GeneticAlgorithm(*params)
+
+
+def _run_island_epoch(task):
+    population, generations, deadline, seed = task
+    ga = _island_ga
+    random.seed(seed)
+    if population is None:
+        population = ga.initialize_population()
+
+    population, solution, fitness, timed_out = ga.run_generations(population, generations, deadline)
+
+    # The last generation has not been scored yet: rank it for migration and
+    # let it compete for the island's best.
+    fitness_scores, feasible = ga.evaluate_population(population)
+    for i, score in enumerate(fitness_scores):
+        if score > fitness and feasible[i]:
+            solution = population[i]
+            fitness = score
+    order = sorted(range(len(population)), key=fitness_scores.__getitem__, reverse=True)
+    return [population[i] for i in order], solution, fitness, timed_out
+
 def main():
-    m, n = map(int, input().split()) 
-    orders = [tuple(map(int, input().split())) for _ in range(m)]
-    vehicles = [tuple(map(int, input().split())) for _ in range(n)]
+    instance = Instance.from_tuples(*read_instance(sys.stdin))
 
     population_size = 50
     generations = 100
     mutation_rate = 0.1
     time_limit = 5  
 
-    ga = GeneticAlgorithm(orders, vehicles, population_size, generations, mutation_rate, time_limit)
-    solution, fitness = ga.evolve()
+    def solve(reduction):
+        reduced = reduction.instance
+        ga = GeneticAlgorithm(reduced, None, population_size, generations, mutation_rate, time_limit,
+                              upper_bound=upper_bound(reduced), target_gap=0.0)
+        return ga.evolve()[0]
+
+    solution, _ = solve_presolved(instance, solve)
 
     served_orders = sum(1 for x in solution if x != -1)
     print(served_orders)
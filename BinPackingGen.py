@@ -0,0 +1,137 @@
+import argparse
+import os
+import random
+import sys
+from array import array
+
+from BinPackingIO import BinaryWriter
+
+# Seeded instance generator. Instances follow the distribution of the original
+# Debug/genTest.py, which produced the TestFrom(...) suites: d and c uniform in
+# [1, 100], c1 in [1, 100], c2 in [c1, 200], and c2 raised (up to 200) vehicle by
+# vehicle until the total capacity covers the total demand. tightness in [0, 1]
+# shrinks every [c1, c2] window towards c2 by that fraction, so 1 asks for exact loads.
+#
+# Case index of a run with a given seed draws from its own Random(f"{seed}:{index}"),
+# so any case can be regenerated on its own and the text and binary outputs of a
+# seed hold the same instances. Instances are generated one at a time into int32
+# arrays and written in chunks, never as one large string.
+
+# (orders, vehicles) ranges; the first four are the TestFrom(...) suites
+SIZE_CLASSES = {
+    "xs": ((0, 250), (0, 25)),
+    "s": ((250, 500), (25, 50)),
+    "m": ((500, 750), (50, 75)),
+    "l": ((750, 1000), (75, 100)),
+    "xl": ((1000, 10000), (100, 1000)),
+    "xxl": ((10000, 100000), (1000, 10000)),
+}
+
+_CHUNK = 8192
+
+
+def parse_range(text):
+    # "a-b" or a single "a"
+    low, _, high = text.partition("-")
+    low = int(low)
+    high = int(high) if high else low
+    if low < 0 or high < low:
+        raise ValueError(f"Invalid range: {text}")
+    return low, high
+
+
+def suite_name(orders, vehicles):
+    return f"TestFrom({orders[0]}-{orders[1]}, {vehicles[0]}-{vehicles[1]})"
+
+
+def generate_arrays(rng, orders, vehicles, tightness=0.0, max_demand=100, max_cost=100,
+                    max_lower=100, max_upper=200):
+    # One instance as (demands, costs, lower, upper); orders and vehicles are the
+    # inclusive ranges N and K are drawn from
+    if not 0 <= tightness <= 1:
+        raise ValueError(f"tightness must lie in [0, 1], got {tightness}")
+    n = rng.randint(*orders)
+    k = rng.randint(*vehicles)
+    demands = array("i", rng.choices(range(1, max_demand + 1), k=n))
+    costs = array("i", rng.choices(range(1, max_cost + 1), k=n))
+    lower = array("i", rng.choices(range(1, max_lower + 1), k=k))
+    upper = array("i", (rng.randint(c1, max(c1, max_upper)) for c1 in lower))
+
+    missing = sum(demands) - sum(upper)
+    for j in range(k):
+        if missing <= 0:
+            break
+        extra = max(0, min(missing, max_upper - upper[j]))
+        upper[j] += extra
+        missing -= extra
+
+    if tightness:
+        for j in range(k):
+            lower[j] = upper[j] - int((1 - tightness) * (upper[j] - lower[j]))
+    return demands, costs, lower, upper
+
+
+def generate_instances(seed, count, orders, vehicles, **options):
+    # Yields count instances one at a time; options go to generate_arrays
+    for index in range(count):
+        yield generate_arrays(random.Random(f"{seed}:{index}"), orders, vehicles, **options)
+
+
+def _write_pairs(f, first, second):
+    for start in range(0, len(first), _CHUNK):
+        end = start + _CHUNK
+        f.write("".join(f"{a} {b}\n" for a, b in zip(first[start:end], second[start:end])))
+
+
+def write_text(path, arrays):
+    demands, costs, lower, upper = arrays
+    with open(path, "w") as f:
+        f.write(f"{len(demands)} {len(lower)}\n")
+        _write_pairs(f, demands, costs)
+        _write_pairs(f, lower, upper)
+
+
+def write_suite(root, seed, count, orders, vehicles, **options):
+    # Writes root/TestFrom(...)/test_case_<i>.txt, the layout discover_instances reads
+    directory = os.path.join(root, suite_name(orders, vehicles))
+    os.makedirs(directory, exist_ok=True)
+    for index, arrays in enumerate(generate_instances(seed, count, orders, vehicles, **options), 1):
+        write_text(os.path.join(directory, f"test_case_{index}.txt"), arrays)
+    return directory
+
+
+def write_binary_suite(path, seed, count, orders, vehicles, **options):
+    with BinaryWriter(path) as writer:
+        for arrays in generate_instances(seed, count, orders, vehicles, **options):
+            writer.write(arrays)
+    return path
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate seeded instances in the layout of the TestFrom(...) suites.")
+    parser.add_argument("--size", choices=SIZE_CLASSES, default="xs",
+                        help="Size class; --orders and --vehicles override its ranges")
+    parser.add_argument("--orders", type=parse_range, help="Range of N, e.g. 20000-50000")
+    parser.add_argument("--vehicles", type=parse_range, help="Range of K, e.g. 2000-5000")
+    parser.add_argument("--count", type=int, default=10)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--tightness", type=float, default=0.0,
+                        help="Fraction of every [c1, c2] window removed, from 0 (suite-like) to 1")
+    output = parser.add_mutually_exclusive_group(required=True)
+    output.add_argument("--out", help="Directory the TestFrom(...) suite is written under")
+    output.add_argument("--binary", help="Write all instances to one BPK1 file instead")
+    args = parser.parse_args()
+
+    orders, vehicles = SIZE_CLASSES[args.size]
+    orders = args.orders or orders
+    vehicles = args.vehicles or vehicles
+    if args.out:
+        target = write_suite(args.out, args.seed, args.count, orders, vehicles, tightness=args.tightness)
+    else:
+        target = write_binary_suite(args.binary, args.seed, args.count, orders, vehicles,
+                                    tightness=args.tightness)
+    print(f"{args.count} instances written to {target}", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,84 @@
+import copy
+import time
+
+from BinPackingCore import Assignment, Instance
+from BinPackingCP import SolverConfig, VehicleRoutingCPSAT, read_input, solution_from_assignments
+from BinPackingGA import GeneticAlgorithm
+from BinPackingPresolve import solve_presolved
+from BinPackingSA import SimulatedAnnealing
+
+
+def run_heuristic(orders, vehicles, heuristic, time_limit):
+    if heuristic == "sa":
+        sa = SimulatedAnnealing(orders, vehicles, initial_temp=1000, cooling_rate=0.95, time_limit=time_limit)
+        solution, _ = sa.simulated_annealing()
+    elif heuristic == "ga":
+        ga = GeneticAlgorithm(orders, vehicles, population_size=50, generations=100,
+                              mutation_rate=0.1, time_limit=time_limit)
+        solution, _ = ga.evolve()
+    else:
+        raise ValueError(f"Unknown heuristic: {heuristic}")
+    return solution
+
+
+def solve_hybrid(orders, vehicles=None, heuristic="sa", heuristic_time=1, config=None, compact=True,
+                 dominance=None, vehicle_classes=None):
+    # The heuristic's best assignment becomes the CP-SAT solution hint. When it is
+    # feasible for the CP model its served cost also becomes an objective lower bound,
+    # so CP-SAT starts from a known incumbent and spends its time improving on it.
+    # The compact model (orders may stay unserved) matches the objective of the
+    # heuristics; the full model requires every order to be served.
+    # config.max_time_in_seconds bounds the whole call: the heuristic and the model
+    # build are taken out of the CP-SAT budget. dominance and vehicle_classes come
+    # from presolve, as in VehicleRoutingCPSAT.
+    start_time = time.time()
+    instance = Instance.coerce(orders, vehicles)
+    solution = run_heuristic(instance, None, heuristic, heuristic_time)
+
+    vr_cp_sat = VehicleRoutingCPSAT(instance, None, compact=compact, dominance=dominance,
+                                    vehicle_classes=vehicle_classes)
+    config = copy.copy(config) if config is not None else SolverConfig()
+    if config.max_time_in_seconds is not None:
+        config.max_time_in_seconds = max(0.0, config.max_time_in_seconds - (time.time() - start_time))
+    feasible = False
+    if solution is not None:
+        # Relabelled to satisfy the compact model's symmetry breaking and dominance
+        solution = vr_cp_sat.canonical_solution(solution)
+        config.hints = solution
+        feasible = vr_cp_sat.is_model_feasible(solution)
+        if feasible:
+            vr_cp_sat.add_objective_lower_bound(Assignment(instance, list(solution)).cost)
+
+    status, assignments, total_cost, bound = vr_cp_sat.run(config)
+    if total_cost is None and feasible:
+        # CP-SAT ran out of time before reproducing the hinted incumbent
+        assignments = [(i + 1, v + 1) for i, v in enumerate(solution) if v != -1]
+        total_cost = Assignment(instance, list(solution)).cost
+    return status, assignments, total_cost, bound
+
+
+def main():
+    orders, vehicles = read_input()
+
+    if len(orders) == 0 or len(vehicles) == 0:
+        print("No solution possible. Either no orders or no vehicles.")
+        return
+
+    def solve(reduction):
+        _, assignments, total_cost, _ = solve_hybrid(reduction.instance, dominance=reduction.dominance,
+                                                     vehicle_classes=reduction.vehicle_classes)
+        return solution_from_assignments(reduction.instance.num_orders, assignments, total_cost)
+
+    instance = Instance.from_tuples(orders, vehicles)
+    solution, _ = solve_presolved(instance, solve, optional_vehicles=True)
+    if solution is None:
+        print("No solution found.")
+        return
+    print(f"Total cost of served orders: {Assignment(instance, solution).cost}")
+    for i, v in enumerate(solution):
+        if v != -1:
+            print(f"Order {i + 1} is assigned to Vehicle {v + 1}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,156 @@
+import hashlib
+import os
+import struct
+import sys
+from array import array
+
+# Instances travel as four int32 arrays: demands, costs, lower (c1) and upper (c2).
+#
+# Binary layout (little-endian), written as a stream so instances never have to be
+# held in memory together:
+#   b"BPK1"
+#   per instance: n, k (uint32) then demands[n], costs[n], lower[k], upper[k] (int32)
+#   footer: offsets[count] (uint64), count (uint64), b"BPK1"
+
+MAGIC = b"BPK1"
+DEFAULT_CACHE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), ".bpcache")
+
+_HEADER = struct.Struct("<II")
+_FOOTER = struct.Struct("<Q4s")
+
+
+def parse_arrays(text):
+    # Whole-instance parse: one split, one int conversion and strided slices
+    values = array("i", map(int, text.split()))
+    if len(values) < 2:
+        raise ValueError("Instance is missing its 'N K' header.")
+    n, k = values[0], values[1]
+    end = 2 + 2 * n + 2 * k
+    if len(values) < end:
+        raise ValueError(f"Instance is truncated: expected {end} integers, got {len(values)}.")
+    orders = values[2:2 + 2 * n]
+    vehicles = values[2 + 2 * n:end]
+    return orders[0::2], orders[1::2], vehicles[0::2], vehicles[1::2]
+
+
+def as_tuples(arrays):
+    demands, costs, lower, upper = arrays
+    return list(zip(demands, costs)), list(zip(lower, upper))
+
+
+def read_instance(stream):
+    # Replacement for the line-by-line input() loops; returns (orders, vehicles)
+    return as_tuples(parse_arrays(stream.read()))
+
+
+def _to_bytes(values):
+    values = array("i", values)
+    if sys.byteorder == "big":
+        values.byteswap()
+    return values.tobytes()
+
+
+def _from_bytes(buffer, offset, count):
+    values = array("i")
+    values.frombytes(buffer[offset:offset + 4 * count])
+    if sys.byteorder == "big":
+        values.byteswap()
+    return values, offset + 4 * count
+
+
+class BinaryWriter:
+    def __init__(self, path):
+        self.file = open(path, "wb")
+        self.file.write(MAGIC)
+        self.offsets = array("Q")
+
+    def write(self, arrays):
+        demands, costs, lower, upper = arrays
+        self.offsets.append(self.file.tell())
+        self.file.write(_HEADER.pack(len(demands), len(lower)))
+        for values in (demands, costs, lower, upper):
+            self.file.write(_to_bytes(values))
+
+    def close(self):
+        if self.file.closed:
+            return
+        offsets = self.offsets
+        if sys.byteorder == "big":
+            offsets.byteswap()
+        self.file.write(offsets.tobytes())
+        self.file.write(struct.pack("<Q", len(self.offsets)))
+        self.file.write(MAGIC)
+        self.file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+def write_binary(path, instances):
+    with BinaryWriter(path) as writer:
+        for arrays in instances:
+            writer.write(arrays)
+
+
+def read_binary(path):
+    # Returns the list of (demands, costs, lower, upper) stored in path
+    with open(path, "rb") as f:
+        buffer = f.read()
+    if buffer[:4] != MAGIC or buffer[-4:] != MAGIC:
+        raise ValueError(f"{path} is not a BPK1 instance file.")
+    count = struct.unpack_from("<Q", buffer, len(buffer) - _FOOTER.size)[0]
+    offsets = array("Q")
+    start = len(buffer) - _FOOTER.size - 8 * count
+    offsets.frombytes(buffer[start:start + 8 * count])
+    if sys.byteorder == "big":
+        offsets.byteswap()
+
+    instances = []
+    for offset in offsets:
+        n, k = _HEADER.unpack_from(buffer, offset)
+        offset += _HEADER.size
+        demands, offset = _from_bytes(buffer, offset, n)
+        costs, offset = _from_bytes(buffer, offset, n)
+        lower, offset = _from_bytes(buffer, offset, k)
+        upper, offset = _from_bytes(buffer, offset, k)
+        instances.append((demands, costs, lower, upper))
+    return instances
+
+
+def _cache_path(cache_dir, sources):
+    digest = hashlib.sha1()
+    for data in sources:
+        digest.update(hashlib.sha1(data).digest())
+    return os.path.join(cache_dir, digest.hexdigest() + ".bpk")
+
+
+def load_arrays(paths, cache_dir=None):
+    # Loads several text instances through one cache file keyed by the hash of
+    # their contents, so any edit to a source file invalidates the entry.
+    cache_dir = cache_dir or DEFAULT_CACHE_DIR
+    sources = []
+    for path in paths:
+        with open(path, "rb") as f:
+            sources.append(f.read())
+
+    cache_path = _cache_path(cache_dir, sources)
+    if os.path.exists(cache_path):
+        return read_binary(cache_path)
+
+    instances = [parse_arrays(data.decode()) for data in sources]
+    os.makedirs(cache_dir, exist_ok=True)
+    temp_path = f"{cache_path}.{os.getpid()}.tmp"
+    write_binary(temp_path, instances)
+    os.replace(temp_path, cache_path)
+    return instances
+
+
+def load_instances(paths, cache_dir=None):
+    return [as_tuples(arrays) for arrays in load_arrays(paths, cache_dir)]
+
+
+def load_instance(path, cache_dir=None):
+    return load_instances([path], cache_dir)[0]
@@ -0,0 +1,196 @@
+import math
+import random
+from bisect import bisect
+from itertools import accumulate
+
+from BinPackingConstruct import fill_to_lower
+
+# Genetic operators for BinPackingGA, selectable by name per run. Individuals are
+# lists with the vehicle of each order or -1 when it is unserved.
+#
+# A selector is built once per generation from the fitness scores and returns a
+# pick() callable yielding population indices, so the per-generation setup is paid
+# once and every pick is O(1) (O(log P) for roulette). None of them assume the
+# scores are positive, since infeasible individuals carry a -1000 penalty.
+
+
+def tournament_selector(fitness_scores, size=3):
+    # Best of size uniformly drawn individuals
+    count = len(fitness_scores)
+
+    def pick():
+        best = random.randrange(count)
+        for _ in range(size - 1):
+            challenger = random.randrange(count)
+            if fitness_scores[challenger] > fitness_scores[best]:
+                best = challenger
+        return best
+
+    return pick
+
+
+def rank_selector(fitness_scores, pressure=1.5):
+    # Linear ranking with selection pressure in [1, 2]: a uniform rank, replaced with
+    # probability pressure - 1 by the better of two uniform ranks
+    count = len(fitness_scores)
+    ranked = sorted(range(count), key=fitness_scores.__getitem__)
+    duel = pressure - 1
+
+    def pick():
+        rank = random.randrange(count)
+        if random.random() < duel:
+            rank = max(rank, random.randrange(count))
+        return ranked[rank]
+
+    return pick
+
+
+def roulette_selector(fitness_scores):
+    # Fitness-proportional after shifting the scores so the worst has weight 1
+    worst = min(fitness_scores)
+    cum_weights = list(accumulate(f - worst + 1 for f in fitness_scores))
+    total = cum_weights[-1]
+
+    def pick():
+        return bisect(cum_weights, random.random() * total)
+
+    return pick
+
+
+def one_point_crossover(parent1, parent2, num_vehicles):
+    point = random.randint(1, len(parent1) - 1)
+    return parent1[:point] + parent2[point:], parent2[:point] + parent1[point:]
+
+
+def uniform_crossover(parent1, parent2, num_vehicles):
+    mask = random.randbytes(len(parent1))
+    child1 = [a if m & 1 else b for m, a, b in zip(mask, parent1, parent2)]
+    child2 = [b if m & 1 else a for m, a, b in zip(mask, parent1, parent2)]
+    return child1, child2
+
+
+def vehicle_crossover(parent1, parent2, num_vehicles):
+    # The vehicles are split at random. child1 takes the chosen vehicles from parent1
+    # with every order parent1 puts on them, and the other vehicles from parent2 minus
+    # the orders the chosen ones already claim, so a vehicle taken from parent2 can
+    # lose orders and its load is not inherited intact. An order that parent1 puts on
+    # an unchosen vehicle and parent2 on a chosen one is left unserved for repair.
+    # child2 is the same with the parents swapped. chosen has an extra 0 at the end
+    # so that chosen[-1] reads "unserved" as not chosen.
+    chosen = [m & 1 for m in random.randbytes(num_vehicles)]
+    chosen.append(0)
+    child1 = [a if chosen[a] else (b if not chosen[b] else -1) for a, b in zip(parent1, parent2)]
+    child2 = [b if chosen[b] else (a if not chosen[a] else -1) for a, b in zip(parent1, parent2)]
+    return child1, child2
+
+
+def per_gene_mutation(individual, rate, num_vehicles):
+    for i in range(len(individual)):
+        if random.random() < rate:
+            individual[i] = random.choice(range(num_vehicles))
+    return individual
+
+
+def geometric_mutation(individual, rate, num_vehicles):
+    # Same distribution as per_gene_mutation, but jumps straight to the next mutated
+    # gene with a geometric skip: O(rate * N) random draws instead of N
+    if rate <= 0 or num_vehicles < 1:
+        return individual
+    count = len(individual)
+    if rate >= 1:
+        for i in range(count):
+            individual[i] = random.randrange(num_vehicles)
+        return individual
+    log_keep = math.log(1.0 - rate)
+    i = int(math.log(1.0 - random.random()) / log_keep)
+    while i < count:
+        individual[i] = random.randrange(num_vehicles)
+        i += 1 + int(math.log(1.0 - random.random()) / log_keep)
+    return individual
+
+
+class LoadRepair:
+    # In-place greedy repair. The per-vehicle load buffer is allocated once and reused
+    # for every individual: orders are dropped from overfull vehicles (latest first),
+    # then unserved orders go to the first vehicle with room, trying vehicles still
+    # below c1 before the others. Vehicles that cannot take even the smallest unserved
+    # order are dropped from the scan, and orders larger than the most room left
+    # anywhere are skipped without a scan, so once the vehicles are nearly full most
+    # unserved orders cost O(1). O(N + U * K) for U unserved orders in the worst case.
+    def __init__(self, instance):
+        self.demands, _, self.lower, self.upper = instance.columns()
+        self.zeros = [0] * instance.num_vehicles
+        self.loads = self.zeros[:]
+
+    def __call__(self, individual):
+        demands, lower, upper = self.demands, self.lower, self.upper
+        loads = self.loads
+        loads[:] = self.zeros
+        for v, d in zip(individual, demands):
+            if v != -1:
+                loads[v] += d
+
+        if any(load > c2 for load, c2 in zip(loads, upper)):
+            for i in range(len(individual) - 1, -1, -1):
+                v = individual[i]
+                if v != -1 and loads[v] > upper[v]:
+                    individual[i] = -1
+                    loads[v] -= demands[i]
+
+        unserved = [i for i, v in enumerate(individual) if v == -1]
+        if not unserved:
+            return individual
+        smallest = min(demands[i] for i in unserved)
+        vehicles = [j for j in range(len(loads)) if upper[j] - loads[j] >= smallest]
+        targets = [j for j in vehicles if loads[j] < lower[j]]
+        targets.extend(j for j in vehicles if loads[j] >= lower[j])
+        room = max((upper[j] - loads[j] for j in targets), default=-1)
+        for i in unserved:
+            d = demands[i]
+            if d > room:
+                if room < smallest:
+                    break
+                continue
+            for j in targets:
+                if loads[j] + d <= upper[j]:
+                    individual[i] = j
+                    had_most_room = upper[j] - loads[j] == room
+                    loads[j] += d
+                    if upper[j] - loads[j] < smallest:
+                        targets.remove(j)
+                    if had_most_room:
+                        room = max((upper[k] - loads[k] for k in targets), default=-1)
+                    break
+        return individual
+
+
+class LowerBoundRepair:
+    # BinPackingConstruct.fill_to_lower, which also lifts vehicles that are below c1
+    def __init__(self, instance):
+        self.instance = instance
+
+    def __call__(self, individual):
+        return fill_to_lower(self.instance, individual)
+
+
+SELECTIONS = {
+    "tournament": tournament_selector,
+    "rank": rank_selector,
+    "roulette": roulette_selector,
+}
+
+CROSSOVERS = {
+    "one_point": one_point_crossover,
+    "uniform": uniform_crossover,
+    "vehicle": vehicle_crossover,
+}
+
+MUTATIONS = {
+    "per_gene": per_gene_mutation,
+    "geometric": geometric_mutation,
+}
+
+REPAIRS = {
+    "loads": LoadRepair,
+    "lower": LowerBoundRepair,
+}
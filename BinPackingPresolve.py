@@ -0,0 +1,115 @@
+from BinPackingCore import Instance
+
+
+class Reduction:
+    # A presolved instance plus what is needed to map its solutions back.
+    #   order_map[r] / vehicle_map[r]: original index of reduced order / vehicle r
+    #   removed_orders / removed_vehicles: (original index, reason) pairs
+    #   vehicle_classes: groups of reduced vehicles with identical (c1, c2)
+    #   dominance: (better, worse) reduced order pairs with equal demand and
+    #       cost[better] >= cost[worse]; some optimum serves better whenever it
+    #       serves worse, since swapping the two leaves every load unchanged
+    #   infeasible: a vehicle can never reach c1 while every vehicle must be used
+    def __init__(self, original, instance, order_map, vehicle_map, removed_orders, removed_vehicles,
+                 vehicle_classes, dominance, infeasible):
+        self.original = original
+        self.instance = instance
+        self.order_map = order_map
+        self.vehicle_map = vehicle_map
+        self.removed_orders = removed_orders
+        self.removed_vehicles = removed_vehicles
+        self.vehicle_classes = vehicle_classes
+        self.dominance = dominance
+        self.infeasible = infeasible
+
+    def postsolve(self, solution):
+        # Reduced solution (vehicle per reduced order, -1 unserved) to original indices
+        if solution is None:
+            return None
+        full = [-1] * self.original.num_orders
+        for r, v in enumerate(solution):
+            if v != -1:
+                full[self.order_map[r]] = self.vehicle_map[v]
+        return full
+
+    def summary(self):
+        return {
+            "orders": (self.original.num_orders, self.instance.num_orders),
+            "vehicles": (self.original.num_vehicles, self.instance.num_vehicles),
+            "removed_orders": len(self.removed_orders),
+            "removed_vehicles": len(self.removed_vehicles),
+            "vehicle_classes": sum(1 for group in self.vehicle_classes if len(group) > 1),
+            "dominance_pairs": len(self.dominance),
+            "infeasible": self.infeasible,
+        }
+
+
+def presolve(instance, optional_vehicles=False):
+    # Removes orders heavier than every vehicle's c2. When vehicles may stay unused
+    # (optional_vehicles, as in the compact CP model) vehicles with c1 > c2 or whose
+    # c1 exceeds the total demand of the orders that fit into them are removed too,
+    # which can in turn make more orders unservable, so both passes repeat until
+    # nothing changes. Without optional_vehicles such a vehicle makes the instance
+    # infeasible and is only reported.
+    demands, costs, lower, upper = instance.columns()
+    orders = list(range(instance.num_orders))
+    vehicles = list(range(instance.num_vehicles))
+    removed_orders = []
+    removed_vehicles = []
+    infeasible = False
+
+    changed = True
+    while changed:
+        changed = False
+        max_upper = max((upper[j] for j in vehicles), default=-1)
+        kept = [i for i in orders if demands[i] <= max_upper]
+        if len(kept) < len(orders):
+            removed_orders.extend((i, "fits no vehicle") for i in orders if demands[i] > max_upper)
+            orders = kept
+            changed = True
+
+        unusable = []
+        for j in vehicles:
+            if lower[j] > upper[j]:
+                unusable.append((j, "c1 > c2"))
+            elif sum(demands[i] for i in orders if demands[i] <= upper[j]) < lower[j]:
+                unusable.append((j, "c1 exceeds servable demand"))
+        if unusable and optional_vehicles:
+            dropped = {j for j, _ in unusable}
+            vehicles = [j for j in vehicles if j not in dropped]
+            removed_vehicles.extend(unusable)
+            changed = True
+        elif unusable:
+            infeasible = True
+
+    reduced = Instance(
+        [demands[i] for i in orders],
+        [costs[i] for i in orders],
+        [lower[j] for j in vehicles],
+        [upper[j] for j in vehicles],
+    )
+
+    classes = {}
+    for r, j in enumerate(vehicles):
+        classes.setdefault((lower[j], upper[j]), []).append(r)
+
+    by_demand = {}
+    for r, i in enumerate(orders):
+        by_demand.setdefault(demands[i], []).append(r)
+    dominance = []
+    for group in by_demand.values():
+        group.sort(key=lambda r: -costs[orders[r]])
+        dominance.extend(zip(group, group[1:]))
+
+    return Reduction(instance, reduced, orders, vehicles, removed_orders, removed_vehicles,
+                     list(classes.values()), dominance, infeasible)
+
+
+def solve_presolved(instance, solve, optional_vehicles=False):
+    # solve(reduction) returns a solution of reduction.instance (or None), and may use
+    # the dominance pairs and vehicle classes; the result is mapped back to the
+    # original order and vehicle indices.
+    reduction = presolve(instance, optional_vehicles)
+    if reduction.instance.num_orders == 0 or reduction.instance.num_vehicles == 0:
+        return [-1] * instance.num_orders, reduction
+    return reduction.postsolve(solve(reduction)), reduction
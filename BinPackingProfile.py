@@ -0,0 +1,141 @@
+import json
+import os
+from time import perf_counter
+
+# Opt-in instrumentation shared by the solvers. A solver takes a profiler argument
+# and falls back to NULL_PROFILER, whose methods do nothing; hot loops aggregate in
+# local variables and report once per batch or generation, so a disabled profiler
+# costs a few no-op calls per batch. Loops that time many small steps read
+# profiler.clock(), which is perf_counter when enabled and returns 0.0 otherwise.
+# Collected:
+#   timers:   total seconds and calls per phase (init, evaluation, search, ...)
+#   counters: moves tried/accepted, evaluations, cache hits, branches, ...
+#   trace:    (elapsed, objective, bound) for every improvement, i.e. convergence
+#   events:   (name, start, duration) per timed phase, for the Chrome trace
+
+
+class _Phase:
+    __slots__ = ("profiler", "name", "start")
+
+    def __init__(self, profiler, name):
+        self.profiler = profiler
+        self.name = name
+        self.start = 0.0
+
+    def __enter__(self):
+        self.start = perf_counter()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.profiler.add_event(self.name, self.start, perf_counter())
+
+
+def _no_clock():
+    return 0.0
+
+
+class Profiler:
+    enabled = True
+    clock = staticmethod(perf_counter)
+
+    def __init__(self, name="solver", max_events=100_000):
+        self.name = name
+        self.max_events = max_events
+        self.origin = perf_counter()
+        self.timers = {}
+        self.counters = {}
+        self.trace = []
+        self.events = []
+
+    def phase(self, name):
+        # with profiler.phase("search"): ...
+        return _Phase(self, name)
+
+    def add_time(self, name, seconds, calls=1):
+        timer = self.timers.get(name)
+        if timer is None:
+            self.timers[name] = [seconds, calls]
+        else:
+            timer[0] += seconds
+            timer[1] += calls
+
+    def add_event(self, name, start, end):
+        self.add_time(name, end - start)
+        if len(self.events) < self.max_events:
+            self.events.append((name, start - self.origin, end - start))
+
+    def count(self, name, value=1):
+        self.counters[name] = self.counters.get(name, 0) + value
+
+    def record(self, objective, bound=None):
+        self.trace.append((perf_counter() - self.origin, objective, bound))
+
+    def to_dict(self):
+        return {
+            "name": self.name,
+            "timers": {name: {"seconds": round(seconds, 6), "calls": calls}
+                       for name, (seconds, calls) in self.timers.items()},
+            "counters": dict(self.counters),
+            "trace": [{"elapsed": round(elapsed, 6), "objective": objective, "bound": bound}
+                      for elapsed, objective, bound in self.trace],
+        }
+
+    def write_json(self, path):
+        with open(path, "w") as f:
+            json.dump(self.to_dict(), f, indent=2)
+
+    def chrome_trace(self):
+        # Trace Event Format, loadable in chrome://tracing or Perfetto: one complete
+        # event per timed phase and a counter track for the objective and bound
+        pid = os.getpid()
+        events = [
+            {"name": name, "cat": self.name, "ph": "X", "ts": round(start * 1e6, 3),
+             "dur": round(duration * 1e6, 3), "pid": pid, "tid": 0}
+            for name, start, duration in self.events
+        ]
+        for elapsed, objective, bound in self.trace:
+            args = {"objective": objective}
+            if bound is not None:
+                args["bound"] = bound
+            events.append({"name": "convergence", "cat": self.name, "ph": "C",
+                           "ts": round(elapsed * 1e6, 3), "pid": pid, "args": args})
+        return {"traceEvents": events, "displayTimeUnit": "ms",
+                "otherData": {"counters": dict(self.counters)}}
+
+    def write_chrome_trace(self, path):
+        with open(path, "w") as f:
+            json.dump(self.chrome_trace(), f)
+
+
+class _NullPhase:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        return None
+
+
+class NullProfiler:
+    enabled = False
+    clock = staticmethod(_no_clock)
+    _phase = _NullPhase()
+
+    def phase(self, name):
+        return self._phase
+
+    def add_time(self, name, seconds, calls=1):
+        pass
+
+    def add_event(self, name, start, end):
+        pass
+
+    def count(self, name, value=1):
+        pass
+
+    def record(self, objective, bound=None):
+        pass
+
+
+NULL_PROFILER = NullProfiler()
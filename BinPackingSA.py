@@ -1,86 +1,377 @@
 import random
 import math
+import sys
 import time
+from bisect import bisect
+
+from BinPackingAnytime import Incumbent
+from BinPackingBounds import optimality_gap, reached_gap, upper_bound
+from BinPackingConstruct import construct
+from BinPackingCore import Assignment, Instance
+from BinPackingIO import read_instance
+from BinPackingPresolve import solve_presolved
+from BinPackingProfile import NULL_PROFILER
+from BinPackingSchedule import Clock, make_schedule
+
+
+MOVE = 0
+SWAP = 1
+
+
+def propose_relocate(state, num_vehicles):
+    # Served order to a different vehicle
+    served = state.served
+    if not served or num_vehicles < 2:
+        return None
+    i = served[random.randrange(len(served))]
+    v = random.randrange(num_vehicles - 1)
+    if v >= state.solution[i]:
+        v += 1
+    return MOVE, i, v
+
+
+def propose_unassign(state, num_vehicles):
+    served = state.served
+    if not served:
+        return None
+    return MOVE, served[random.randrange(len(served))], -1
+
+
+def propose_insert(state, num_vehicles):
+    unserved = state.unserved
+    if not unserved or num_vehicles < 1:
+        return None
+    return MOVE, unserved[random.randrange(len(unserved))], random.randrange(num_vehicles)
+
+
+def propose_swap(state, num_vehicles):
+    # Two served orders on different vehicles exchange vehicles
+    served = state.served
+    if len(served) < 2:
+        return None
+    i = served[random.randrange(len(served))]
+    j = served[random.randrange(len(served))]
+    if state.solution[i] == state.solution[j]:
+        return None
+    return SWAP, i, j
+
+
+MOVES = {
+    "relocate": propose_relocate,
+    "unassign": propose_unassign,
+    "insert": propose_insert,
+    "swap": propose_swap,
+}
+
+DEFAULT_MOVE_WEIGHTS = {"relocate": 0.35, "unassign": 0.1, "insert": 0.35, "swap": 0.2}
+
+
+class DeltaState(Assignment):
+    # Adds the number of vehicles out of their [c1, c2] range to the Assignment
+    # caches so that a move can be scored without rescanning the solution.
+    __slots__ = ("lower", "upper", "violations", "pools", "slot")
+
+    def __init__(self, instance, solution):
+        Assignment.__init__(self, instance, solution)
+        _, _, self.lower, self.upper = instance.columns()
+        self.violations = sum(
+            1 for v, load in enumerate(self.loads) if self.is_violated(v, load)
+        )
+
+        # Served and unserved order pools with O(1) membership updates
+        self.pools = ([], [])
+        self.slot = [0] * len(self.solution)
+        for i, v in enumerate(self.solution):
+            pool = self.pools[v != -1]
+            self.slot[i] = len(pool)
+            pool.append(i)
+
+    @property
+    def served(self):
+        return self.pools[1]
+
+    @property
+    def unserved(self):
+        return self.pools[0]
+
+    def is_violated(self, v, load):
+        return load < self.lower[v] or load > self.upper[v]
+
+    def is_feasible(self, allow_unused=False):
+        if allow_unused:
+            return Assignment.is_feasible(self, allow_unused)
+        return self.violations == 0
+
+    def assign(self, i, v):
+        self.apply_move(i, v)
+
+    def swap_delta(self, i, j):
+        # Exchanging the vehicles of orders i and j; returns (feasible, cost delta)
+        solution = self.solution
+        a, b = solution[i], solution[j]
+        if a == b:
+            return self.violations == 0, 0
+
+        shift = self.demands[j] - self.demands[i]
+        violations = self.violations
+        cost_delta = 0
+        if a == -1:
+            cost_delta += self.costs[i] - self.costs[j]
+        else:
+            load = self.loads[a]
+            violations += self.is_violated(a, load + shift) - self.is_violated(a, load)
+        if b == -1:
+            cost_delta += self.costs[j] - self.costs[i]
+        else:
+            load = self.loads[b]
+            violations += self.is_violated(b, load - shift) - self.is_violated(b, load)
+        return violations == 0, cost_delta
+
+    def apply_swap(self, i, j):
+        solution = self.solution
+        a, b = solution[i], solution[j]
+        if a == b:
+            return
+
+        shift = self.demands[j] - self.demands[i]
+        if a == -1:
+            self.cost += self.costs[i] - self.costs[j]
+        else:
+            self._set_load(a, self.loads[a] + shift)
+        if b == -1:
+            self.cost += self.costs[j] - self.costs[i]
+        else:
+            self._set_load(b, self.loads[b] - shift)
+        if a == -1 or b == -1:
+            # i and j trade places between the served and unserved pools
+            pools, slot = self.pools, self.slot
+            pools[a != -1][slot[i]], pools[b != -1][slot[j]] = j, i
+            slot[i], slot[j] = slot[j], slot[i]
+        solution[i], solution[j] = b, a
+
+    def move_delta(self, i, v):
+        # Reassigning order i to vehicle v (-1 drops it); returns (feasible, cost delta)
+        a = self.solution[i]
+        if a == v:
+            return self.violations == 0, 0
+
+        d = self.demands[i]
+        violations = self.violations
+        cost_delta = 0
+        if a == -1:
+            cost_delta += self.costs[i]
+        else:
+            load = self.loads[a]
+            violations += self.is_violated(a, load - d) - self.is_violated(a, load)
+        if v == -1:
+            cost_delta -= self.costs[i]
+        else:
+            load = self.loads[v]
+            violations += self.is_violated(v, load + d) - self.is_violated(v, load)
+        return violations == 0, cost_delta
+
+    def apply_move(self, i, v):
+        a = self.solution[i]
+        if a == v:
+            return
+
+        d = self.demands[i]
+        if a == -1:
+            self.cost += self.costs[i]
+            self._repool(i, 1)
+        else:
+            self._set_load(a, self.loads[a] - d)
+        if v == -1:
+            self.cost -= self.costs[i]
+            self._repool(i, 0)
+        else:
+            self._set_load(v, self.loads[v] + d)
+        self.solution[i] = v
+
+    def evaluate(self, move):
+        kind, i, x = move
+        if kind == SWAP:
+            return self.swap_delta(i, x)
+        return self.move_delta(i, x)
+
+    def apply(self, move):
+        kind, i, x = move
+        if kind == SWAP:
+            self.apply_swap(i, x)
+        else:
+            self.apply_move(i, x)
+
+    def _repool(self, i, served):
+        source = self.pools[1 - served]
+        k = self.slot[i]
+        last = source.pop()
+        if last != i:
+            source[k] = last
+            self.slot[last] = k
+        target = self.pools[served]
+        self.slot[i] = len(target)
+        target.append(i)
+
+    def _set_load(self, v, load):
+        self.violations += self.is_violated(v, load) - self.is_violated(v, self.loads[v])
+        self.loads[v] = load
+
 
 class SimulatedAnnealing:
-    def __init__(self, orders, vehicles, initial_temp, cooling_rate, time_limit):
-        self.orders = orders  
-        self.vehicles = vehicles  
+    def __init__(self, orders, vehicles, initial_temp, cooling_rate, time_limit, move_weights=None,
+                 upper_bound=None, target_gap=None, constructor="best_fit_ratio", schedule="adaptive",
+                 stall_fraction=0.05, restart_after=3, profiler=None):
+        # orders may also be an Instance, in which case vehicles is ignored. The search
+        # stops early once the best cost is within target_gap of upper_bound, and
+        # starts from the named BinPackingConstruct constructor. schedule names a
+        # BinPackingSchedule schedule ("geometric" is the original per-iteration
+        # cooling, the only one that uses cooling_rate). When the best cost has not
+        # improved for stall_fraction of the budget the schedule is reheated, and every
+        # restart_after reheats the search also restarts from the best solution.
+        # profiler is an optional BinPackingProfile.Profiler.
+        self.instance = Instance.coerce(orders, vehicles)
+        self.orders = self.instance.orders
+        self.vehicles = self.instance.vehicles
         self.initial_temp = initial_temp
         self.cooling_rate = cooling_rate
         self.time_limit = time_limit  
+        self.move_weights = move_weights or DEFAULT_MOVE_WEIGHTS
+        self.constructor = constructor
+        self.schedule = make_schedule(schedule, initial_temp, cooling_rate)
+        self.stall_fraction = stall_fraction
+        self.restart_after = restart_after
+        self.reheats = 0
+        self.restarts = 0
+        self.profiler = profiler or NULL_PROFILER
+        self.upper_bound = upper_bound
+        self.target_gap = target_gap
         self.best_solution = None
         self.best_cost = 0
+        self.iterations = 0
+        self.gap = None
+
+        names = [name for name, weight in self.move_weights.items() if weight > 0]
+        if not names:
+            raise ValueError("At least one move needs a positive weight.")
+        self.move_proposers = [MOVES[name] for name in names]
+        self.move_cum_weights = []
+        total = 0
+        for name in names:
+            total += self.move_weights[name]
+            self.move_cum_weights.append(total)
+
+    def propose_move(self, state):
+        r = random.random() * self.move_cum_weights[-1]
+        propose = self.move_proposers[bisect(self.move_cum_weights, r)]
+        return propose(state, len(self.vehicles))
 
     def initialize_solution(self):
-        solution = [-1] * len(self.orders)
-        for i, (d, _) in enumerate(self.orders):
-            for v, (c1, c2) in enumerate(self.vehicles):
-                current_quantity = sum(self.orders[j][0] for j in range(len(solution)) if solution[j] == v)
-                if current_quantity + d <= c2:
-                    solution[i] = v
-                    break
-        return solution
-
-    def is_feasible(self, solution):
-        for v in range(len(self.vehicles)):
-            c1, c2 = self.vehicles[v]
-            total_quantity = sum(self.orders[i][0] for i in range(len(solution)) if solution[i] == v)
-            if total_quantity < c1 or total_quantity > c2:
-                return False
-        return True
-
-    def calculate_cost(self, solution):
-        total_cost = sum(self.orders[i][1] for i in range(len(solution)) if solution[i] != -1)
-        return total_cost
-
-    def get_neighbor(self, solution):
-        neighbor = solution[:]
-        i = random.randint(0, len(solution) - 1)
-
-        j = random.randint(0, len(solution) - 1)
-        if i != j:
-            neighbor[i], neighbor[j] = neighbor[j], neighbor[i]
-        return neighbor
-
-    def simulated_annealing(self):
-        start_time = time.time()
-        temp = self.initial_temp
-        current_solution = self.initialize_solution()
-        current_cost = self.calculate_cost(current_solution) if self.is_feasible(current_solution) else 0
-        self.best_solution = current_solution[:]
+        return construct(self.instance, self.constructor)
+
+    def simulated_annealing(self, on_improvement=None, cancel=None):
+        # on_improvement receives an Incumbent for every new best solution; the search
+        # stops early once cancel (a CancelToken) is cancelled. The clock, cancellation,
+        # stall detection and the temperature are handled once per batch of iterations.
+        profiler = self.profiler
+        schedule = self.schedule
+        schedule.start()
+        clock = Clock(self.time_limit, max_batch=schedule.max_batch)
+        start_time = clock.start
+        with profiler.phase("init"):
+            state = DeltaState(self.instance, self.initialize_solution())
+        current_cost = state.cost if state.is_feasible() else 0
+        self.best_solution = state.solution[:]
         self.best_cost = current_cost
+        self.iterations = 0
+        self.reheats = 0
+        self.restarts = 0
+        profiler.record(self.best_cost, self.upper_bound)
+        if on_improvement is not None:
+            on_improvement(Incumbent(self.best_solution[:], self.best_cost, time.time() - start_time))
 
-        while temp > 1 and (time.time() - start_time) < self.time_limit:
-            neighbor = self.get_neighbor(current_solution)
-            if self.is_feasible(neighbor):
-                neighbor_cost = self.calculate_cost(neighbor)
-                delta = neighbor_cost - current_cost
+        last_improvement = 0.0
+        last_reheat = 0.0
+        improved = False
+        done = reached_gap(self.best_cost, self.upper_bound, self.target_gap)
+        with profiler.phase("search"):
+            while not done:
+                progress = clock.check()
+                if progress >= 1 or schedule.finished:
+                    break
+                if cancel is not None and cancel.cancelled:
+                    break
+                if improved:
+                    last_improvement = progress
+                    improved = False
+                if progress - max(last_improvement, last_reheat) >= self.stall_fraction:
+                    self.reheats += 1
+                    last_reheat = progress
+                    schedule.reheat(progress)
+                    if self.restart_after and self.reheats % self.restart_after == 0:
+                        self.restarts += 1
+                        state = DeltaState(self.instance, self.best_solution[:])
+                        current_cost = self.best_cost
 
-                if delta > 0 or random.random() < math.exp(delta / temp):
-                    current_solution = neighbor[:]
-                    current_cost = neighbor_cost
+                temp = schedule.temperature(progress)
+                worse = 0
+                accepted = 0
+                applied = 0
+                batch = clock.batch
+                for step in range(batch):
+                    move = self.propose_move(state)
+                    feasible, cost_delta = state.evaluate(move) if move else (False, 0)
+                    if not feasible:
+                        continue
+                    neighbor_cost = state.cost + cost_delta
+                    delta = neighbor_cost - current_cost
+                    if delta < 0:
+                        worse += 1
+                        if random.random() >= math.exp(delta / temp):
+                            continue
+                        accepted += 1
 
+                    state.apply(move)
+                    applied += 1
+                    current_cost = neighbor_cost
                     if current_cost > self.best_cost:
-                        self.best_solution = current_solution[:]
+                        self.best_solution = state.solution[:]
                         self.best_cost = current_cost
-
-            temp *= self.cooling_rate
+                        improved = True
+                        profiler.record(self.best_cost, self.upper_bound)
+                        if on_improvement is not None:
+                            on_improvement(Incumbent(self.best_solution[:], self.best_cost,
+                                                     time.time() - start_time))
+                        if reached_gap(self.best_cost, self.upper_bound, self.target_gap):
+                            done = True
+                            batch = step + 1
+                            break
+                self.iterations += batch
+                schedule.observe(batch, worse, accepted)
+                profiler.count("moves_tried", batch)
+                profiler.count("moves_accepted", applied)
+                profiler.count("worsening_moves", worse)
+                profiler.count("worsening_accepted", accepted)
+        profiler.count("reheats", self.reheats)
+        profiler.count("restarts", self.restarts)
+        self.gap = optimality_gap(self.best_cost, self.upper_bound)
         return self.best_solution, self.best_cost 
 
 
 def main():
-    m, n = map(int, input().split())
-    orders = [tuple(map(int, input().split())) for _ in range(m)]
-    vehicles = [tuple(map(int, input().split())) for _ in range(n)]
+    instance = Instance.from_tuples(*read_instance(sys.stdin))
     
     
     initial_temp = 1000
     cooling_rate = 0.95
     time_limit = 5  
     
-    sa = SimulatedAnnealing(orders, vehicles, initial_temp, cooling_rate, time_limit)
-    solution, cost = sa.simulated_annealing()
+    def solve(reduction):
+        reduced = reduction.instance
+        sa = SimulatedAnnealing(reduced, None, initial_temp, cooling_rate, time_limit,
+                                upper_bound=upper_bound(reduced), target_gap=0.0)
+        return sa.simulated_annealing()[0]
+
+    solution, _ = solve_presolved(instance, solve)
     
     
     served_orders = sum(1 for x in solution if x != -1)
@@ -0,0 +1,156 @@
+import math
+import time
+
+# Temperature schedules for BinPackingSA, selectable by name. The annealer works in
+# batches of iterations: once per batch it reads the Clock, asks the schedule for
+# the temperature at the current progress (the fraction of the time budget used) and
+# afterwards reports how many worsening moves were proposed and accepted.
+
+
+class Clock:
+    # Amortized deadline: time.time() is read once per batch of iterations, and the
+    # batch size doubles or halves so that a read happens about every resolution
+    # seconds. max_batch caps the batch (1 reads the clock on every iteration).
+    def __init__(self, time_limit, resolution=0.005, max_batch=None):
+        self.time_limit = time_limit
+        self.resolution = resolution
+        self.max_batch = max_batch
+        self.start = self.last = time.time()
+        self.elapsed = 0.0
+        self.batch = 1
+
+    def check(self):
+        # Returns the progress in [0, inf); the budget is used up at 1
+        now = time.time()
+        since_last = now - self.last
+        self.last = now
+        self.elapsed = now - self.start
+        if since_last < self.resolution / 2:
+            self.batch *= 2
+        elif since_last > self.resolution * 2 and self.batch > 1:
+            self.batch //= 2
+        if self.max_batch is not None:
+            self.batch = min(self.batch, self.max_batch)
+        if self.time_limit <= 0:
+            return math.inf
+        return self.elapsed / self.time_limit
+
+
+class GeometricSchedule:
+    # The original schedule: the temperature is multiplied by cooling_rate after every
+    # iteration and the search ends once it drops to min_temp, whatever the time
+    # budget. The clock is read every iteration, as before.
+    max_batch = 1
+
+    def __init__(self, initial_temp, cooling_rate=0.95, min_temp=1):
+        self.initial_temp = initial_temp
+        self.cooling_rate = cooling_rate
+        self.min_temp = min_temp
+        self.temp = initial_temp
+
+    def start(self):
+        self.temp = self.initial_temp
+
+    @property
+    def finished(self):
+        return self.temp <= self.min_temp
+
+    def temperature(self, progress):
+        return self.temp
+
+    def observe(self, iterations, worse, accepted):
+        self.temp *= self.cooling_rate ** iterations
+
+    def reheat(self, progress):
+        pass
+
+
+class TimeSchedule:
+    # Exponential cooling from initial_temp to final_temp over the time budget, so
+    # the temperature follows the deadline instead of the iteration count. A reheat
+    # restarts the curve over the remaining budget from reheat_decay times the
+    # previous peak.
+    max_batch = None
+    finished = False
+
+    def __init__(self, initial_temp, final_temp=0.1, reheat_decay=0.5):
+        self.initial_temp = initial_temp
+        self.final_temp = final_temp
+        self.reheat_decay = reheat_decay
+        self.peak = initial_temp
+        self.segment_start = 0.0
+
+    def start(self):
+        self.peak = self.initial_temp
+        self.segment_start = 0.0
+
+    def temperature(self, progress):
+        span = 1.0 - self.segment_start
+        fraction = min(1.0, (progress - self.segment_start) / span) if span > 0 else 1.0
+        final_temp = min(self.final_temp, self.peak)
+        return self.peak * (final_temp / self.peak) ** fraction
+
+    def observe(self, iterations, worse, accepted):
+        pass
+
+    def reheat(self, progress):
+        self.peak = max(self.final_temp, self.peak * self.reheat_decay)
+        self.segment_start = min(progress, 1.0)
+
+
+class AdaptiveSchedule(TimeSchedule):
+    # TimeSchedule whose temperature is scaled by feedback on the acceptance rate of
+    # worsening moves: the rate is steered towards a target that decays from
+    # target_start to target_end over the budget, raising the temperature when too
+    # few worsening moves pass and lowering it when too many do.
+    def __init__(self, initial_temp, final_temp=0.1, reheat_decay=0.5, target_start=0.05,
+                 target_end=0.0005, step=1.1, window=50):
+        TimeSchedule.__init__(self, initial_temp, final_temp, reheat_decay)
+        self.target_start = target_start
+        self.target_end = target_end
+        self.step = step
+        self.window = window
+        self.scale = 1.0
+        self.progress = 0.0
+        self.worse = 0
+        self.accepted = 0
+
+    def start(self):
+        TimeSchedule.start(self)
+        self.scale = 1.0
+        self.progress = 0.0
+        self.worse = 0
+        self.accepted = 0
+
+    def target(self, progress):
+        return self.target_start * (self.target_end / self.target_start) ** min(1.0, progress)
+
+    def temperature(self, progress):
+        self.progress = progress
+        return TimeSchedule.temperature(self, progress) * self.scale
+
+    def observe(self, iterations, worse, accepted):
+        # Adjusts the scale once window worsening moves have been seen
+        self.worse += worse
+        self.accepted += accepted
+        if self.worse < self.window:
+            return
+        if self.accepted / self.worse < self.target(self.progress):
+            self.scale = min(self.scale * self.step, 1e3)
+        else:
+            self.scale = max(self.scale / self.step, 1e-3)
+        self.worse = 0
+        self.accepted = 0
+
+
+SCHEDULES = {
+    "geometric": GeometricSchedule,
+    "time": TimeSchedule,
+    "adaptive": AdaptiveSchedule,
+}
+
+
+def make_schedule(name, initial_temp, cooling_rate):
+    if name == "geometric":
+        return GeometricSchedule(initial_temp, cooling_rate)
+    return SCHEDULES[name](initial_temp)
@@ -0,0 +1,130 @@
+import argparse
+import json
+import multiprocessing
+import os
+import sys
+import time
+
+from BinPackingBench import OPTIONAL_VEHICLE_SOLVERS, SOLVERS, evaluate_solution, run_solver
+from BinPackingBounds import DEFAULT_MAX_DP_CELLS, DP_SECONDS_PER_CELL, optimality_gap, upper_bound
+from BinPackingCore import Instance
+from BinPackingDispatch import DispatchPolicy, run_plan
+
+
+# Long-lived solver service. Requests arrive on stdin as JSON lines:
+#   {"id": 1, "solver": "sa", "orders": [[d, c], ...], "vehicles": [[c1, c2], ...],
+#    "deadline": 5, "seed": 0}
+# and results are streamed to stdout as JSON lines in completion order:
+#   {"id": 1, "objective": ..., "feasible": ..., "gap": ..., "solution": [...], "elapsed": ...}
+# The solver "auto" lets BinPackingDispatch pick the solver and its budget; it only
+# picks a solver that may leave vehicles empty when the request sets
+# "optional_vehicles": true.
+# The deadline (seconds) counts from the moment the request was read, so time
+# spent waiting in the queue is taken out of the solver budget.
+
+DEFAULT_DEADLINE = 5
+# Seconds kept back from the solver budget for evaluating and serializing the result.
+# CP-SAT also overruns its own time limit, by up to about 70 ms on the largest suite
+# models, so the solvers built on it keep back more.
+RESPONSE_MARGIN = 0.05
+CP_RESPONSE_MARGIN = 0.15
+CP_SOLVERS = ("cp", "cp-compact", "hybrid")
+# Largest share of the remaining time the DP bounds may take; beyond it they are
+# skipped and the cheaper bounds are used
+BOUND_SHARE = 0.2
+
+
+def _margin(solver):
+    return CP_RESPONSE_MARGIN if solver in CP_SOLVERS else RESPONSE_MARGIN
+
+_policy = None
+
+
+def _read_requests(stream):
+    for line in stream:
+        line = line.strip()
+        if line:
+            yield line, time.time()
+
+
+def _init_worker(policy_path=None):
+    # Solvers report progress with print(); keep stdout for the result stream
+    global _policy
+    sys.stdout = sys.stderr
+    _policy = DispatchPolicy.load(policy_path) if policy_path else DispatchPolicy()
+
+
+def handle_request(task):
+    line, received = task
+    request_id = None
+    try:
+        request = json.loads(line)
+        request_id = request.get("id")
+        solver = request.get("solver", "sa")
+        if solver != "auto" and solver not in SOLVERS:
+            raise ValueError(f"Unknown solver: {solver}")
+        orders = [tuple(order) for order in request["orders"]]
+        vehicles = [tuple(vehicle) for vehicle in request["vehicles"]]
+        deadline = request.get("deadline", DEFAULT_DEADLINE)
+        if not orders or not vehicles:
+            return {"id": request_id, "error": "no orders or no vehicles"}
+
+        remaining = deadline - (time.time() - received)
+        if remaining <= RESPONSE_MARGIN:
+            return {"id": request_id, "error": "deadline exceeded before start"}
+
+        # The bound is computed up front so that its time comes out of the solver
+        # budget; sa and ga also use it to stop early
+        instance = Instance.from_tuples(orders, vehicles)
+        max_cells = int(BOUND_SHARE * remaining / DP_SECONDS_PER_CELL)
+        bound = upper_bound(instance, max_dp_cells=min(DEFAULT_MAX_DP_CELLS, max_cells),
+                            max_vehicle_dp_cells=max_cells)
+        remaining = deadline - (time.time() - received)
+
+        if solver == "auto":
+            plan = _policy.plan(instance, remaining - RESPONSE_MARGIN,
+                                request.get("optional_vehicles", False))
+            solver = plan.solver
+            plan.time_limit = max(0.0, min(plan.time_limit, remaining - _margin(solver)))
+            solution = run_plan(plan, instance, request.get("seed", 0), bound)
+        else:
+            solution, _ = run_solver(solver, instance, request.get("seed", 0),
+                                     max(0.0, remaining - _margin(solver)), 1, bound=bound)
+        objective, feasible = evaluate_solution(instance, solution, allow_unused=solver in OPTIONAL_VEHICLE_SOLVERS)
+        gap = optimality_gap(objective if feasible else None, bound)
+        elapsed = time.time() - received
+        return {
+            "id": request_id,
+            "objective": objective,
+            "feasible": feasible,
+            "gap": gap,
+            "solution": solution,
+            "elapsed": round(elapsed, 4),
+            "late": elapsed > deadline,
+        }
+    except Exception as e:
+        return {"id": request_id, "error": f"{type(e).__name__}: {e}"}
+
+
+def serve(stream_in, stream_out, processes=None, batch_size=1, policy_path=None):
+    # Requests are handed to the pool batch_size at a time; larger batches cut
+    # dispatch overhead for floods of small instances. policy_path is a policy saved
+    # by BinPackingDispatch for "auto" requests.
+    with multiprocessing.Pool(processes or os.cpu_count(), initializer=_init_worker,
+                              initargs=(policy_path,)) as pool:
+        for result in pool.imap_unordered(handle_request, _read_requests(stream_in), chunksize=batch_size):
+            stream_out.write(json.dumps(result) + "\n")
+            stream_out.flush()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve solver requests from stdin as JSON lines.")
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--batch-size", type=int, default=1)
+    parser.add_argument("--policy", help="Dispatch policy for \"auto\" requests")
+    args = parser.parse_args()
+    serve(sys.stdin, sys.stdout, args.workers, args.batch_size, args.policy)
+
+
+if __name__ == "__main__":
+    main()